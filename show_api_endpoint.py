@@ -8,432 +8,556 @@ Webull Japan OpenAPI - 全エンドポイント一覧表示スクリプト
 公式ドキュメント: https://developer.webull.co.jp/api-doc/
 """
 
-import os
 import sys
+import json
+import argparse
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from importlib.util import find_spec
+from typing import Final, NamedTuple, Optional, TextIO
 
 try:
-    from webullsdkcore.client import ApiClient
-    from webullsdktrade.api import API
-    from webullsdkcore.common.region import Region
-    SDK_AVAILABLE = True
+    import orjson
 except ImportError:
-    SDK_AVAILABLE = False
+    orjson = None
+
+# SDKの有無はモジュールを検索するだけで判定する（パッケージのimport処理は実行しない）
+SDK_AVAILABLE = find_spec("webullsdkcore") is not None and find_spec("webullsdktrade") is not None
+
+# 区切り線
+_EQ100 = "=" * 100
+_DASH100 = "-" * 100
+_BOX96 = "─" * 96
+
+# カテゴリー見出しの表示テンプレート
+_CAT_HEADER_TMPL = (
+    "\n"
+    f"{_EQ100}\n"
+    "{n}. {cat}\n"
+    f"{_EQ100}\n"
+    "説明: {desc}{note}\n"
+    "\n"
+    f"{_DASH100}"
+)
+
+# エンドポイント1件分の表示テンプレート
+_EP_TMPL = (
+    "\n"
+    "  {label} {name}\n"
+    "  {box}\n"
+    "  HTTPメソッド    : {method}\n"
+    "  パス           : {path}\n"
+    "  SDKメソッド    : {sdk_method}\n"
+    "  説明           : {description}\n"
+    "  パラメータ     :{params}\n"
+    "  レスポンス     : {response}{extra}\n"
+)
+_PARAM_SEP = "\n                   - "
+
+# 1回の実行で output_lines に追加される要素数の上限目安
+# （SDKチェック最大9行（見出し2行 + 確認結果最大6行 + 空行1行） + ヘッダー10行 + キャッシュ済み本文1要素）
+_EXPECTED_LINES = 9 + 10 + 1
+
+class Endpoint(NamedTuple):
+    """
+    エンドポイント1件分の定義
+    
+    辞書ではなく NamedTuple にすることで、1件あたりのメモリを抑え
+    属性アクセスで各項目を参照できるようにしている
+    （dataclass の slots=True は Python 3.10 以降のため使用しない）
+    """
+    name: str
+    method: str
+    path: str
+    sdk_method: str
+    description: str
+    parameters: tuple
+    response: str
+    frequency_limit: Optional[str] = None
+    status: Optional[str] = None
+
+
+# Webull Japan OpenAPIの全エンドポイント定義（公式ドキュメントに基づいて整理）
+# 静的なデータのため、インスタンスごとに再構築せずモジュール読み込み時に一度だけ生成する
+# 同じ文字列リテラル（"GET", "account_id: 口座ID", "N/A" など）はコンパイル時に
+# 1つの定数へまとめられるため、sys.intern() で改めて共有させる必要はない
+_ENDPOINTS: Final[dict] = {
+    "口座管理 (Account Management)": {
+        "description": "口座情報の取得と管理",
+        "endpoints": (
+            Endpoint(
+                name="口座購読情報の取得",
+                method="GET",
+                path="/account/subscriptions",
+                sdk_method="api.account.get_app_subscriptions()",
+                description="APIアプリケーションに紐づく口座情報の一覧を取得",
+                parameters=(),
+                response="口座ID、購読ID、ステータスなど"
+            ),
+            Endpoint(
+                name="口座詳細情報の取得",
+                method="GET",
+                path="/account/{account_id}",
+                sdk_method="api.account.get_account_detail(account_id)",
+                description="指定した口座の詳細情報を取得",
+                parameters=("account_id: 口座ID",),
+                response="口座詳細情報"
+            ),
+            Endpoint(
+                name="口座残高の取得",
+                method="GET",
+                path="/account/{account_id}/balance",
+                sdk_method="api.account.get_account_balance(account_id)",
+                description="口座の現金残高、購買力、総資産額などを取得",
+                parameters=("account_id: 口座ID",),
+                response="現金残高、購買力、総資産額など"
+            ),
+            Endpoint(
+                name="口座ポジションの取得",
+                method="GET",
+                path="/account/{account_id}/positions",
+                sdk_method="api.account.get_account_positions(account_id)",
+                description="保有している株式ポジション情報を取得",
+                parameters=("account_id: 口座ID",),
+                response="銘柄、数量、平均取得価格、現在価格など"
+            )
+        )
+    },
+    
+    "注文管理 (Order Management)": {
+        "description": "注文の作成、変更、キャンセル、照会",
+        "endpoints": (
+            Endpoint(
+                name="注文の作成",
+                method="POST",
+                path="/order",
+                sdk_method="api.order.place_order(account_id, order_params)",
+                description="新規注文を作成(成行、指値、逆指値など)",
+                parameters=(
+                    "account_id: 口座ID",
+                    "order_params: 注文パラメータ(銘柄、数量、価格、注文タイプなど)",
+                ),
+                response="注文ID、クライアント注文ID、ステータス"
+            ),
+            Endpoint(
+                name="注文の変更",
+                method="PUT",
+                path="/order/{order_id}",
+                sdk_method="api.order.modify_order(account_id, order_id, new_params)",
+                description="既存注文の価格や数量を変更",
+                parameters=(
+                    "account_id: 口座ID",
+                    "order_id: 注文ID",
+                    "new_params: 変更パラメータ",
+                ),
+                response="変更後の注文情報"
+            ),
+            Endpoint(
+                name="注文のキャンセル",
+                method="DELETE",
+                path="/order/{order_id}",
+                sdk_method="api.order.cancel_order(account_id, order_id)",
+                description="指定した注文をキャンセル",
+                parameters=(
+                    "account_id: 口座ID",
+                    "order_id: 注文ID",
+                ),
+                response="キャンセル結果"
+            ),
+            Endpoint(
+                name="注文詳細の取得",
+                method="GET",
+                path="/order/{order_id}",
+                sdk_method="api.order.query_order_detail(account_id, client_order_id)",
+                description="指定した注文の詳細情報を取得",
+                parameters=(
+                    "account_id: 口座ID",
+                    "client_order_id: クライアント注文ID",
+                ),
+                response="注文の詳細情報、ステータス、約定情報など"
+            ),
+            Endpoint(
+                name="注文一覧の取得",
+                method="GET",
+                path="/orders",
+                sdk_method="api.order.query_orders(account_id, params)",
+                description="口座の注文一覧を取得(フィルタ可能)",
+                parameters=(
+                    "account_id: 口座ID",
+                    "params: フィルタパラメータ(日付、ステータスなど)",
+                ),
+                response="注文のリスト"
+            ),
+            Endpoint(
+                name="未約定注文の取得",
+                method="GET",
+                path="/orders/open",
+                sdk_method="api.order.get_open_orders(account_id)",
+                description="現在有効な未約定注文を取得",
+                parameters=("account_id: 口座ID",),
+                response="未約定注文のリスト"
+            )
+        )
+    },
+    
+    "マーケットデータ (Market Data) - GRPC": {
+        "description": "株式情報とマーケットデータの取得",
+        "note": "※現在、HTTP経由のマーケットデータリクエストは未サポート。GRPCプロトコルを使用。",
+        "endpoints": (
+            Endpoint(
+                name="銘柄情報の取得",
+                method="GRPC",
+                path="/instrument",
+                sdk_method="grpc_api.instrument.get_instrument(symbols, category)",
+                description="銘柄コードリストから銘柄の基本情報を取得",
+                parameters=(
+                    "symbols: 銘柄コードのリスト (例: ['AAPL', 'TSLA'])",
+                    "category: カテゴリ (例: 'US_STOCK')",
+                ),
+                response="銘柄名、ISIN、取引所、セクターなど",
+                frequency_limit="60回/分"
+            ),
+            Endpoint(
+                name="マーケットスナップショット",
+                method="GRPC",
+                path="/market-data/snapshot",
+                sdk_method="grpc_api.market_data.get_snapshot(symbols, category)",
+                description="銘柄の最新価格情報をバッチ取得",
+                parameters=(
+                    "symbols: 銘柄コードのリスト",
+                    "category: カテゴリ",
+                ),
+                response="最新価格、出来高、高値、安値など",
+                frequency_limit="1回/秒"
+            ),
+            Endpoint(
+                name="ローソク足データ",
+                method="GRPC",
+                path="/market-data/bars",
+                sdk_method="grpc_api.market_data.get_bars(symbol, category, timeframe, count)",
+                description="指定期間のローソク足データを取得",
+                parameters=(
+                    "symbol: 銘柄コード",
+                    "category: カテゴリ",
+                    "timeframe: 時間足(1m, 5m, 1d等)",
+                    "count: データ件数",
+                ),
+                response="OHLCV(始値、高値、安値、終値、出来高)データ"
+            )
+        )
+    },
+    
+    "リアルタイム購読 (Real-time Subscriptions)": {
+        "description": "注文ステータスとマーケットデータのリアルタイム受信",
+        "endpoints": (
+            Endpoint(
+                name="注文イベント購読",
+                method="GRPC",
+                path="/trade-events",
+                sdk_method="EventsClient.do_subscribe([account_ids])",
+                description="注文ステータス変更のリアルタイム通知を受信",
+                parameters=("account_ids: 監視する口座IDのリスト",),
+                response="注文作成、約定、キャンセル等のイベント通知"
+            ),
+            Endpoint(
+                name="マーケットデータ購読",
+                method="MQTT",
+                path="/quotes/subscribe",
+                sdk_method="DefaultQuotesClient.connect_and_loop_forever()",
+                description="銘柄の価格変動をリアルタイムで受信",
+                parameters=(
+                    "symbol: 監視する銘柄コード",
+                    "category: カテゴリ",
+                    "subscribe_type: 購読タイプ(SNAPSHOT等)",
+                ),
+                response="リアルタイムの価格更新情報"
+            )
+        )
+    },
+    
+    "取引カレンダー (Trading Calendar)": {
+        "description": "市場の営業日情報",
+        "endpoints": (
+            Endpoint(
+                name="取引カレンダーの取得",
+                method="GET",
+                path="/trade/calendar",
+                sdk_method="api.market.get_trading_calendar(market, start_date, end_date)",
+                description="指定期間の取引日と休場日を取得",
+                parameters=(
+                    "market: 市場コード(US等)",
+                    "start_date: 開始日",
+                    "end_date: 終了日",
+                ),
+                response="取引日のリスト、休場日情報"
+            ),
+        )
+    },
+    
+    "現在利用不可のエンドポイント": {
+        "description": "将来実装予定または条件付きで利用可能",
+        "note": "※これらのエンドポイントは現在Webull Japan OpenAPIではサポートされていません",
+        "endpoints": (
+            Endpoint(
+                name="入出金履歴の取得",
+                method="N/A",
+                path="未実装",
+                sdk_method="未サポート",
+                description="口座の入出金取引履歴を取得",
+                parameters=("N/A",),
+                response="N/A",
+                status="❌ 未実装 - カスタマーサポートへの問い合わせが必要"
+            ),
+            Endpoint(
+                name="全銘柄リストの取得",
+                method="N/A",
+                path="未実装",
+                sdk_method="未サポート",
+                description="取引可能な全銘柄のリストを取得",
+                parameters=("N/A",),
+                response="N/A",
+                status="❌ 未実装 - 銘柄コード指定が必要"
+            ),
+            Endpoint(
+                name="銘柄検索",
+                method="N/A",
+                path="未実装",
+                sdk_method="未サポート",
+                description="キーワードで銘柄を検索",
+                parameters=("N/A",),
+                response="N/A",
+                status="❌ 未実装"
+            )
+        )
+    }
+}
+
+# 表示順に並べた全エンドポイント
+_FLAT_ENDPOINTS: Final[tuple] = tuple(
+    endpoint for data in _ENDPOINTS.values() for endpoint in data['endpoints']
+)
+
+# 実装済みエンドポイントのビットマスク（i番目のビット = i番目のエンドポイントが実装済み）
+_IMPLEMENTED_MASK: Final[int] = sum(
+    1 << i for i, endpoint in enumerate(_FLAT_ENDPOINTS) if endpoint.status is None
+)
+
+# サマリー用の件数（静的データなので読み込み時に確定させておく）
+# int.bit_count() は Python 3.10 以降のため bin().count() で数える
+_TOTAL_EPS: Final[int] = len(_FLAT_ENDPOINTS)
+_IMPLEMENTED_EPS: Final[int] = bin(_IMPLEMENTED_MASK).count('1')
+
+# 表示用の通し番号ラベル（"[カテゴリー番号-エンドポイント番号]"）を表示順に並べたもの
+_EP_INDEX_LABELS: Final[tuple] = tuple(
+    f"[{category_num}-{endpoint_num}]"
+    for category_num, data in enumerate(_ENDPOINTS.values(), 1)
+    for endpoint_num in range(1, len(data['endpoints']) + 1)
+)
+
+
+@cache
+def _render_body() -> str:
+    """
+    生成日時以降のレポート本文を組み立てる
+    
+    本文は静的な _ENDPOINTS だけから決まるため、結果をキャッシュして
+    同一プロセス内での2回目以降の呼び出しでは再生成しない
+    """
+    lines = []
+    add = lines.append
+    labels = iter(_EP_INDEX_LABELS)
+    
+    # カテゴリーごとにエンドポイントを表示
+    for category_num, (category, data) in enumerate(_ENDPOINTS.items(), 1):
+        note = f"\n注意: {data['note']}" if 'note' in data else ""
+        add(_CAT_HEADER_TMPL.format(n=category_num, cat=category, desc=data['description'], note=note))
+        
+        for endpoint in data['endpoints']:
+            params = endpoint.parameters
+            extra = ""
+            if endpoint.frequency_limit is not None:
+                extra += f"\n  頻度制限       : {endpoint.frequency_limit}"
+            if endpoint.status is not None:
+                extra += f"\n  ステータス     : {endpoint.status}"
+            
+            add(_EP_TMPL.format(
+                **endpoint._asdict(),
+                label=next(labels),
+                box=_BOX96,
+                params=_PARAM_SEP + _PARAM_SEP.join(params) if params else " なし",
+                extra=extra,
+            ))
+    
+    # サマリー情報
+    add("")
+    add(_EQ100)
+    add("サマリー")
+    add(_EQ100)
+    add("")
+    
+    add(f"総エンドポイント数        : {_TOTAL_EPS}")
+    add(f"実装済みエンドポイント数  : {_IMPLEMENTED_EPS}")
+    add(f"未実装エンドポイント数    : {_TOTAL_EPS - _IMPLEMENTED_EPS}")
+    add("")
+    
+    # プロトコル別
+    add("プロトコル別の分類:")
+    add("  - HTTP  : 口座管理、注文管理、取引カレンダー")
+    add("  - GRPC  : マーケットデータ取得、注文イベント購読")
+    add("  - MQTT  : リアルタイムマーケットデータ購読")
+    add("")
+    
+    # SDK情報
+    add("必要なPythonパッケージ:")
+    add("  pip install --upgrade webull-python-sdk-core")
+    add("  pip install --upgrade webull-python-sdk-trade")
+    add("  pip install --upgrade webull-python-sdk-quotes-core")
+    add("  pip install --upgrade webull-python-sdk-mdata")
+    add("  pip install --upgrade webull-python-sdk-trade-events-core")
+    add("")
+    
+    # 重要な注意事項
+    add(_EQ100)
+    add("重要な注意事項")
+    add(_EQ100)
+    add("")
+    add("1. 米国株の全銘柄リストを直接取得するAPIは存在しません")
+    add("   → 銘柄コードを指定して個別に情報を取得する必要があります")
+    add("")
+    add("2. 入出金履歴の取得APIは未実装です")
+    add("   → Webullモバイルアプリまたはカスタマーサポートへの問い合わせが必要")
+    add("")
+    add("3. マーケットデータのHTTPリクエストは現在未サポート")
+    add("   → GRPCプロトコルを使用する必要があります")
+    add("")
+    add("4. APIキーの有効期限はデフォルトで45日間")
+    add("   → 期限切れ前にリセットが必要です")
+    add("")
+    add("5. API呼び出しには頻度制限があります")
+    add("   → 各エンドポイントの制限を確認してください")
+    add("")
+    add(_EQ100)
+    add("")
+    
+    return "\n".join(lines)
+
+
+def _catalogue_as_dict() -> dict:
+    """_ENDPOINTS をJSONに変換できる辞書形式で返す（未設定の項目は省略）"""
+    return {
+        category: {
+            **{key: value for key, value in data.items() if key != 'endpoints'},
+            'endpoints': [
+                {key: value for key, value in endpoint._asdict().items() if value is not None}
+                for endpoint in data['endpoints']
+            ],
+        }
+        for category, data in _ENDPOINTS.items()
+    }
+
+
+def _probe_sdks() -> list:
+    """SDKのインストール状況を確認し、表示行のリストを返す"""
+    if not SDK_AVAILABLE:
+        return [
+            "✗ Webull Python SDK がインストールされていません",
+            "",
+            "以下のコマンドでインストールしてください:",
+            "  pip install --upgrade webull-python-sdk-core",
+            "  pip install --upgrade webull-python-sdk-trade",
+            "  pip install --upgrade webull-python-sdk-quotes-core",
+        ]
+    
+    lines = ["✓ Webull Python SDK がインストールされています"]
+    for package, module in (
+        ("webull-python-sdk-core", "webullsdkcore"),
+        ("webull-python-sdk-trade", "webullsdktrade"),
+        ("webull-python-sdk-quotes-core", "webullsdkquotescore"),
+    ):
+        installed = find_spec(module) is not None
+        lines.append(f"  - {package}: {'インストール済み' if installed else '未インストール'}")
+    return lines
 
 
 class WebullEndpointLister:
     """Webull Japan OpenAPIエンドポイント一覧表示クラス"""
     
-    def __init__(self):
-        """初期化"""
-        self.output_lines = []
-        self.endpoints = self._define_endpoints()
-        
-    def _define_endpoints(self) -> dict:
+    def __init__(self, sink: Optional[TextIO] = None):
         """
-        Webull Japan OpenAPIの全エンドポイントを定義
+        初期化
         
-        公式ドキュメントに基づいて整理
+        Args:
+            sink: 出力先のファイルオブジェクト。指定した場合は出力行を保持せず
+                  直接書き込む（標準出力には表示しない）
         """
-        return {
-            "口座管理 (Account Management)": {
-                "description": "口座情報の取得と管理",
-                "endpoints": [
-                    {
-                        "name": "口座購読情報の取得",
-                        "method": "GET",
-                        "path": "/account/subscriptions",
-                        "sdk_method": "api.account.get_app_subscriptions()",
-                        "description": "APIアプリケーションに紐づく口座情報の一覧を取得",
-                        "parameters": [],
-                        "response": "口座ID、購読ID、ステータスなど"
-                    },
-                    {
-                        "name": "口座詳細情報の取得",
-                        "method": "GET",
-                        "path": "/account/{account_id}",
-                        "sdk_method": "api.account.get_account_detail(account_id)",
-                        "description": "指定した口座の詳細情報を取得",
-                        "parameters": ["account_id: 口座ID"],
-                        "response": "口座詳細情報"
-                    },
-                    {
-                        "name": "口座残高の取得",
-                        "method": "GET",
-                        "path": "/account/{account_id}/balance",
-                        "sdk_method": "api.account.get_account_balance(account_id)",
-                        "description": "口座の現金残高、購買力、総資産額などを取得",
-                        "parameters": ["account_id: 口座ID"],
-                        "response": "現金残高、購買力、総資産額など"
-                    },
-                    {
-                        "name": "口座ポジションの取得",
-                        "method": "GET",
-                        "path": "/account/{account_id}/positions",
-                        "sdk_method": "api.account.get_account_positions(account_id)",
-                        "description": "保有している株式ポジション情報を取得",
-                        "parameters": ["account_id: 口座ID"],
-                        "response": "銘柄、数量、平均取得価格、現在価格など"
-                    }
-                ]
-            },
-            
-            "注文管理 (Order Management)": {
-                "description": "注文の作成、変更、キャンセル、照会",
-                "endpoints": [
-                    {
-                        "name": "注文の作成",
-                        "method": "POST",
-                        "path": "/order",
-                        "sdk_method": "api.order.place_order(account_id, order_params)",
-                        "description": "新規注文を作成(成行、指値、逆指値など)",
-                        "parameters": [
-                            "account_id: 口座ID",
-                            "order_params: 注文パラメータ(銘柄、数量、価格、注文タイプなど)"
-                        ],
-                        "response": "注文ID、クライアント注文ID、ステータス"
-                    },
-                    {
-                        "name": "注文の変更",
-                        "method": "PUT",
-                        "path": "/order/{order_id}",
-                        "sdk_method": "api.order.modify_order(account_id, order_id, new_params)",
-                        "description": "既存注文の価格や数量を変更",
-                        "parameters": [
-                            "account_id: 口座ID",
-                            "order_id: 注文ID",
-                            "new_params: 変更パラメータ"
-                        ],
-                        "response": "変更後の注文情報"
-                    },
-                    {
-                        "name": "注文のキャンセル",
-                        "method": "DELETE",
-                        "path": "/order/{order_id}",
-                        "sdk_method": "api.order.cancel_order(account_id, order_id)",
-                        "description": "指定した注文をキャンセル",
-                        "parameters": [
-                            "account_id: 口座ID",
-                            "order_id: 注文ID"
-                        ],
-                        "response": "キャンセル結果"
-                    },
-                    {
-                        "name": "注文詳細の取得",
-                        "method": "GET",
-                        "path": "/order/{order_id}",
-                        "sdk_method": "api.order.query_order_detail(account_id, client_order_id)",
-                        "description": "指定した注文の詳細情報を取得",
-                        "parameters": [
-                            "account_id: 口座ID",
-                            "client_order_id: クライアント注文ID"
-                        ],
-                        "response": "注文の詳細情報、ステータス、約定情報など"
-                    },
-                    {
-                        "name": "注文一覧の取得",
-                        "method": "GET",
-                        "path": "/orders",
-                        "sdk_method": "api.order.query_orders(account_id, params)",
-                        "description": "口座の注文一覧を取得(フィルタ可能)",
-                        "parameters": [
-                            "account_id: 口座ID",
-                            "params: フィルタパラメータ(日付、ステータスなど)"
-                        ],
-                        "response": "注文のリスト"
-                    },
-                    {
-                        "name": "未約定注文の取得",
-                        "method": "GET",
-                        "path": "/orders/open",
-                        "sdk_method": "api.order.get_open_orders(account_id)",
-                        "description": "現在有効な未約定注文を取得",
-                        "parameters": ["account_id: 口座ID"],
-                        "response": "未約定注文のリスト"
-                    }
-                ]
-            },
-            
-            "マーケットデータ (Market Data) - GRPC": {
-                "description": "株式情報とマーケットデータの取得",
-                "note": "※現在、HTTP経由のマーケットデータリクエストは未サポート。GRPCプロトコルを使用。",
-                "endpoints": [
-                    {
-                        "name": "銘柄情報の取得",
-                        "method": "GRPC",
-                        "path": "/instrument",
-                        "sdk_method": "grpc_api.instrument.get_instrument(symbols, category)",
-                        "description": "銘柄コードリストから銘柄の基本情報を取得",
-                        "parameters": [
-                            "symbols: 銘柄コードのリスト (例: ['AAPL', 'TSLA'])",
-                            "category: カテゴリ (例: 'US_STOCK')"
-                        ],
-                        "response": "銘柄名、ISIN、取引所、セクターなど",
-                        "frequency_limit": "60回/分"
-                    },
-                    {
-                        "name": "マーケットスナップショット",
-                        "method": "GRPC",
-                        "path": "/market-data/snapshot",
-                        "sdk_method": "grpc_api.market_data.get_snapshot(symbols, category)",
-                        "description": "銘柄の最新価格情報をバッチ取得",
-                        "parameters": [
-                            "symbols: 銘柄コードのリスト",
-                            "category: カテゴリ"
-                        ],
-                        "response": "最新価格、出来高、高値、安値など",
-                        "frequency_limit": "1回/秒"
-                    },
-                    {
-                        "name": "ローソク足データ",
-                        "method": "GRPC",
-                        "path": "/market-data/bars",
-                        "sdk_method": "grpc_api.market_data.get_bars(symbol, category, timeframe, count)",
-                        "description": "指定期間のローソク足データを取得",
-                        "parameters": [
-                            "symbol: 銘柄コード",
-                            "category: カテゴリ",
-                            "timeframe: 時間足(1m, 5m, 1d等)",
-                            "count: データ件数"
-                        ],
-                        "response": "OHLCV(始値、高値、安値、終値、出来高)データ"
-                    }
-                ]
-            },
-            
-            "リアルタイム購読 (Real-time Subscriptions)": {
-                "description": "注文ステータスとマーケットデータのリアルタイム受信",
-                "endpoints": [
-                    {
-                        "name": "注文イベント購読",
-                        "method": "GRPC",
-                        "path": "/trade-events",
-                        "sdk_method": "EventsClient.do_subscribe([account_ids])",
-                        "description": "注文ステータス変更のリアルタイム通知を受信",
-                        "parameters": ["account_ids: 監視する口座IDのリスト"],
-                        "response": "注文作成、約定、キャンセル等のイベント通知"
-                    },
-                    {
-                        "name": "マーケットデータ購読",
-                        "method": "MQTT",
-                        "path": "/quotes/subscribe",
-                        "sdk_method": "DefaultQuotesClient.connect_and_loop_forever()",
-                        "description": "銘柄の価格変動をリアルタイムで受信",
-                        "parameters": [
-                            "symbol: 監視する銘柄コード",
-                            "category: カテゴリ",
-                            "subscribe_type: 購読タイプ(SNAPSHOT等)"
-                        ],
-                        "response": "リアルタイムの価格更新情報"
-                    }
-                ]
-            },
-            
-            "取引カレンダー (Trading Calendar)": {
-                "description": "市場の営業日情報",
-                "endpoints": [
-                    {
-                        "name": "取引カレンダーの取得",
-                        "method": "GET",
-                        "path": "/trade/calendar",
-                        "sdk_method": "api.market.get_trading_calendar(market, start_date, end_date)",
-                        "description": "指定期間の取引日と休場日を取得",
-                        "parameters": [
-                            "market: 市場コード(US等)",
-                            "start_date: 開始日",
-                            "end_date: 終了日"
-                        ],
-                        "response": "取引日のリスト、休場日情報"
-                    }
-                ]
-            },
-            
-            "現在利用不可のエンドポイント": {
-                "description": "将来実装予定または条件付きで利用可能",
-                "note": "※これらのエンドポイントは現在Webull Japan OpenAPIではサポートされていません",
-                "endpoints": [
-                    {
-                        "name": "入出金履歴の取得",
-                        "method": "N/A",
-                        "path": "未実装",
-                        "sdk_method": "未サポート",
-                        "description": "口座の入出金取引履歴を取得",
-                        "parameters": ["N/A"],
-                        "response": "N/A",
-                        "status": "❌ 未実装 - カスタマーサポートへの問い合わせが必要"
-                    },
-                    {
-                        "name": "全銘柄リストの取得",
-                        "method": "N/A",
-                        "path": "未実装",
-                        "sdk_method": "未サポート",
-                        "description": "取引可能な全銘柄のリストを取得",
-                        "parameters": ["N/A"],
-                        "response": "N/A",
-                        "status": "❌ 未実装 - 銘柄コード指定が必要"
-                    },
-                    {
-                        "name": "銘柄検索",
-                        "method": "N/A",
-                        "path": "未実装",
-                        "sdk_method": "未サポート",
-                        "description": "キーワードで銘柄を検索",
-                        "parameters": ["N/A"],
-                        "response": "N/A",
-                        "status": "❌ 未実装"
-                    }
-                ]
-            }
-        }
-    
+        # 要素数はほぼ決まっているため、あらかじめ確保して添字で埋める
+        self.output_lines = [None] * _EXPECTED_LINES
+        self._n = 0
+        self.endpoints = _ENDPOINTS
+        self.sink = sink
+
     def add_output(self, line: str):
-        """出力行を追加"""
-        self.output_lines.append(line)
-        print(line)
+        """出力行を追加（標準出力への書き込みは flush() でまとめて行う）"""
+        if self.sink is not None:
+            # 通常モードの '\n'.join と同じ内容にするため、改行は2行目以降の前に書き込む
+            if self._n:
+                self.sink.write('\n')
+            self.sink.write(line)
+            self._n += 1
+        elif self._n < len(self.output_lines):
+            self.output_lines[self._n] = line
+            self._n += 1
+        else:
+            self.output_lines.append(line)
+            self._n += 1
+
+    def flush(self):
+        """蓄積した出力行を標準出力へ一括で書き込む"""
+        if self.sink is not None:
+            self.sink.flush()
+            return
+        sys.stdout.write('\n'.join(self.output_lines[:self._n]))
+        sys.stdout.write('\n')
     
-    def display_all_endpoints(self):
-        """全エンドポイントを表示"""
-        self.add_output("=" * 100)
+    def display_all_endpoints(self, timestamp: Optional[str] = None):
+        """
+        全エンドポイントを表示
+        
+        Args:
+            timestamp: 生成日時の表示文字列（省略時は現在時刻）
+        """
+        if timestamp is None:
+            timestamp = datetime.now().isoformat(' ', 'seconds')
+        self.add_output(_EQ100)
         self.add_output("Webull Japan OpenAPI - 全エンドポイント一覧")
-        self.add_output("=" * 100)
+        self.add_output(_EQ100)
         self.add_output("")
-        self.add_output(f"生成日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self.add_output(f"生成日時: {timestamp}")
         self.add_output(f"公式ドキュメント: https://developer.webull.co.jp/api-doc/")
         self.add_output(f"SDK GitHub: https://github.com/webull-inc/openapi-python-sdk")
         self.add_output("")
-        self.add_output("=" * 100)
-        self.add_output("")
-        
-        # カテゴリーごとにエンドポイントを表示
-        for category_num, (category, data) in enumerate(self.endpoints.items(), 1):
-            self.add_output("")
-            self.add_output("=" * 100)
-            self.add_output(f"{category_num}. {category}")
-            self.add_output("=" * 100)
-            self.add_output(f"説明: {data['description']}")
-            
-            if 'note' in data:
-                self.add_output(f"注意: {data['note']}")
-            
-            self.add_output("")
-            self.add_output("-" * 100)
-            
-            for endpoint_num, endpoint in enumerate(data['endpoints'], 1):
-                self.add_output("")
-                self.add_output(f"  [{category_num}-{endpoint_num}] {endpoint['name']}")
-                self.add_output(f"  {'─' * 96}")
-                self.add_output(f"  HTTPメソッド    : {endpoint['method']}")
-                self.add_output(f"  パス           : {endpoint['path']}")
-                self.add_output(f"  SDKメソッド    : {endpoint['sdk_method']}")
-                self.add_output(f"  説明           : {endpoint['description']}")
-                
-                if endpoint['parameters']:
-                    self.add_output(f"  パラメータ     :")
-                    for param in endpoint['parameters']:
-                        self.add_output(f"                   - {param}")
-                else:
-                    self.add_output(f"  パラメータ     : なし")
-                
-                self.add_output(f"  レスポンス     : {endpoint['response']}")
-                
-                if 'frequency_limit' in endpoint:
-                    self.add_output(f"  頻度制限       : {endpoint['frequency_limit']}")
-                
-                if 'status' in endpoint:
-                    self.add_output(f"  ステータス     : {endpoint['status']}")
-                
-                self.add_output("")
-        
-        # サマリー情報
-        self.add_output("")
-        self.add_output("=" * 100)
-        self.add_output("サマリー")
-        self.add_output("=" * 100)
+        self.add_output(_EQ100)
         self.add_output("")
         
-        total_endpoints = sum(len(data['endpoints']) for data in self.endpoints.values())
-        implemented_endpoints = sum(
-            len([ep for ep in data['endpoints'] if 'status' not in ep])
-            for data in self.endpoints.values()
-        )
-        
-        self.add_output(f"総エンドポイント数        : {total_endpoints}")
-        self.add_output(f"実装済みエンドポイント数  : {implemented_endpoints}")
-        self.add_output(f"未実装エンドポイント数    : {total_endpoints - implemented_endpoints}")
-        self.add_output("")
-        
-        # プロトコル別
-        self.add_output("プロトコル別の分類:")
-        self.add_output("  - HTTP  : 口座管理、注文管理、取引カレンダー")
-        self.add_output("  - GRPC  : マーケットデータ取得、注文イベント購読")
-        self.add_output("  - MQTT  : リアルタイムマーケットデータ購読")
-        self.add_output("")
-        
-        # SDK情報
-        self.add_output("必要なPythonパッケージ:")
-        self.add_output("  pip install --upgrade webull-python-sdk-core")
-        self.add_output("  pip install --upgrade webull-python-sdk-trade")
-        self.add_output("  pip install --upgrade webull-python-sdk-quotes-core")
-        self.add_output("  pip install --upgrade webull-python-sdk-mdata")
-        self.add_output("  pip install --upgrade webull-python-sdk-trade-events-core")
-        self.add_output("")
-        
-        # 重要な注意事項
-        self.add_output("=" * 100)
-        self.add_output("重要な注意事項")
-        self.add_output("=" * 100)
-        self.add_output("")
-        self.add_output("1. 米国株の全銘柄リストを直接取得するAPIは存在しません")
-        self.add_output("   → 銘柄コードを指定して個別に情報を取得する必要があります")
-        self.add_output("")
-        self.add_output("2. 入出金履歴の取得APIは未実装です")
-        self.add_output("   → Webullモバイルアプリまたはカスタマーサポートへの問い合わせが必要")
-        self.add_output("")
-        self.add_output("3. マーケットデータのHTTPリクエストは現在未サポート")
-        self.add_output("   → GRPCプロトコルを使用する必要があります")
-        self.add_output("")
-        self.add_output("4. APIキーの有効期限はデフォルトで45日間")
-        self.add_output("   → 期限切れ前にリセットが必要です")
-        self.add_output("")
-        self.add_output("5. API呼び出しには頻度制限があります")
-        self.add_output("   → 各エンドポイントの制限を確認してください")
-        self.add_output("")
-        self.add_output("=" * 100)
-        self.add_output("")
+        # 本文（カテゴリー別一覧・サマリー・注意事項）はキャッシュ済みのものを使う
+        self.add_output(_render_body())
     
-    def display_sdk_check(self):
-        """SDKインストール状況を表示"""
+    def display_sdk_check(self, sdk_lines: Optional[list] = None):
+        """
+        SDKインストール状況を表示
+        
+        Args:
+            sdk_lines: _probe_sdks() の結果（省略時はここで確認する）
+        """
         self.add_output("SDK インストール状況チェック")
-        self.add_output("-" * 100)
+        self.add_output(_DASH100)
         
-        if SDK_AVAILABLE:
-            self.add_output("✓ Webull Python SDK がインストールされています")
-            try:
-                import webullsdkcore
-                self.add_output(f"  - webull-python-sdk-core: インストール済み")
-            except ImportError:
-                self.add_output(f"  - webull-python-sdk-core: 未インストール")
-            
-            try:
-                import webullsdktrade
-                self.add_output(f"  - webull-python-sdk-trade: インストール済み")
-            except ImportError:
-                self.add_output(f"  - webull-python-sdk-trade: 未インストール")
-            
-            try:
-                import webullsdkquotescore
-                self.add_output(f"  - webull-python-sdk-quotes-core: インストール済み")
-            except ImportError:
-                self.add_output(f"  - webull-python-sdk-quotes-core: 未インストール")
-        else:
-            self.add_output("✗ Webull Python SDK がインストールされていません")
-            self.add_output("")
-            self.add_output("以下のコマンドでインストールしてください:")
-            self.add_output("  pip install --upgrade webull-python-sdk-core")
-            self.add_output("  pip install --upgrade webull-python-sdk-trade")
-            self.add_output("  pip install --upgrade webull-python-sdk-quotes-core")
+        if sdk_lines is None:
+            sdk_lines = _probe_sdks()
+        for line in sdk_lines:
+            self.add_output(line)
         
         self.add_output("")
     
@@ -442,29 +566,87 @@ class WebullEndpointLister:
         script_dir = Path(__file__).parent
         output_path = script_dir / filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(self.output_lines))
+        # sink 指定時は書き込み済みなので、ファイル情報の表示のみ行う
+        if self.sink is None:
+            # 一度だけエンコードしてバイナリで書き込む
+            output_path.write_bytes('\n'.join(self.output_lines[:self._n]).encode('utf-8'))
         
         print(f"\n出力ファイル: {output_path}")
         print(f"ファイルサイズ: {output_path.stat().st_size:,} bytes")
+    
+    def save_output_json(self, filename: str):
+        """エンドポイント定義をJSON形式でファイルに保存（orjsonがあれば使用）"""
+        script_dir = Path(__file__).parent
+        output_path = script_dir / filename
+        
+        catalogue = _catalogue_as_dict()
+        if orjson is not None:
+            data = orjson.dumps(catalogue, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(catalogue, ensure_ascii=False, indent=2).encode('utf-8')
+        output_path.write_bytes(data)
+        
+        print(f"\nJSON出力ファイル: {output_path}")
+        print(f"ファイルサイズ: {output_path.stat().st_size:,} bytes")
 
 
 def main():
     """メイン処理"""
-    print("\n" + "=" * 100)
+    parser = argparse.ArgumentParser(description="Webull Japan OpenAPI - 全エンドポイント一覧表示ツール")
+    parser.add_argument(
+        '--file-only',
+        action='store_true',
+        help='一覧を標準出力に表示せず、Markdownファイルへ直接書き込む'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='エンドポイント定義をJSONファイル(スクリプト名.json)にも保存する'
+    )
+    args = parser.parse_args()
+    
+    print("\n" + _EQ100)
     print("Webull Japan OpenAPI - 全エンドポイント一覧表示ツール")
-    print("=" * 100 + "\n")
+    print(_EQ100 + "\n")
+    
+    # 生成日時は実行ごとに一度だけ整形する
+    timestamp = datetime.now().isoformat(' ', 'seconds')
+    
+    output_filename = Path(__file__).stem + '.md'
+    
+    # SDKの確認（ファイルシステム探索）と本文の生成を並行して行う
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sdk_future = executor.submit(_probe_sdks)
+        _render_body()
+        sdk_lines = sdk_future.result()
+    
+    if args.json:
+        WebullEndpointLister().save_output_json(Path(__file__).stem + '.json')
+    
+    if args.file_only:
+        # ファイルのみに出力する場合は行を保持せず直接書き込む
+        # （通常モードの write_bytes と同じバイト列になるよう、改行コードは変換しない）
+        with open(Path(__file__).parent / output_filename, 'w', encoding='utf-8', newline='') as sink:
+            lister = WebullEndpointLister(sink)
+            lister.display_sdk_check(sdk_lines)
+            lister.display_all_endpoints(timestamp=timestamp)
+            lister.flush()
+        lister.save_output(output_filename)
+        print("\n処理が完了しました。")
+        return
     
     lister = WebullEndpointLister()
     
     # SDK状況チェック
-    lister.display_sdk_check()
+    lister.display_sdk_check(sdk_lines)
     
     # 全エンドポイント表示
-    lister.display_all_endpoints()
+    lister.display_all_endpoints(timestamp=timestamp)
+    
+    # 蓄積した出力を一括表示
+    lister.flush()
     
     # 出力をファイルに保存
-    output_filename = Path(__file__).stem + '.md'
     lister.save_output(output_filename)
     
     print("\n処理が完了しました。")
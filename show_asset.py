@@ -29,6 +29,7 @@ Webull Japan API - 資産表示スクリプト（Markdown出力版）
 
 実行方法：
     python webull_asset_display.py
+    python webull_asset_display.py --refresh    # 口座一覧のキャッシュを使用せず取得し直す
 
 出力ファイル：
     webull_asset_display.md（スクリプトと同じディレクトリに生成）
@@ -39,14 +40,65 @@ Webull Japan API - 資産表示スクリプト（Markdown出力版）
 """
 
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from decimal import Decimal
+from typing import NamedTuple, Optional
 from webullsdkcore.client import ApiClient
 from webullsdktrade.api import API
 from webullsdkcore.common.region import Region
 
+# .envの読み込み・接続の再利用・再試行・口座一覧のキャッシュは v1/v2 と共通の処理を使う
+# （キャッシュファイル・有効期間・--refresh オプションを共有する）
+from show_asset_common import (
+    cached_subscriptions,
+    call_api,
+    enable_connection_pooling,
+    load_env_file,
+    loads,
+    parse_args,
+)
+
+# format_amount で使用する定数（呼び出しごとに生成しないようにモジュールで保持）
+_CENT = Decimal('0.01')
+_JPY = 'JPY'
+# 指数表記を含まない通常の10進数文字列（format_amount の高速パス用）
+_PLAIN_NUM = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+# 残高テーブルの行（表示名, APIのキー）
+_BALANCE_ROWS = (
+    ('総現金', 'total_cash'),                  # 総現金残高
+    ('確定現金', 'settled_cash'),              # 確定済み現金（取引完了済み）
+    ('未確定現金', 'unsettled_cash'),          # 未確定現金（取引処理中）
+    ('凍結資金', 'frozen_cash'),               # 凍結資金（注文中など）
+    ('出金可能額', 'available_to_withdraw'),   # 出金可能額
+    ('買付余力', 'stock_power'),               # 買付余力（株式購入可能額）
+)
+
+# ポジション項目の別名（APIによって camelCase / snake_case のキーが混在する）
+# 先に見つかったキーの値を採用する
+_POS_ALIASES = {
+    'quantity': ('position', 'quantity'),
+    'market_value': ('marketValue', 'market_value'),
+    'cost_price': ('costPrice', 'cost_price', 'cost'),
+    'last_price': ('lastPrice', 'last_price'),
+    'unrealized_pl': ('unrealizedProfitLoss', 'unrealized_profit_loss'),
+    'unrealized_pl_rate': ('unrealizedProfitLossRate', 'unrealized_profit_loss_rate'),
+}
+
+# 該当キーが存在しない場合の既定値
+_POS_DEFAULTS = {
+    'quantity': 0,
+    'market_value': 0,
+    'cost_price': 0,
+    'last_price': 0,
+    'unrealized_pl': None,
+    'unrealized_pl_rate': None,
+}
+
 
 class MarkdownLogger:
     """
@@ -55,6 +107,9 @@ class MarkdownLogger:
     このクラスは、sys.stdoutを置き換えることで、print文の出力を
     ターミナルとファイルの両方に同時に書き込みます。
     
+    ファイル側の書き込みは改行単位でまとめてから行い、print が発行する
+    細かい write 呼び出しの回数を減らします（ターミナル側は即時出力）。
+    
     Attributes:
         terminal (TextIO): 元の標準出力（ターミナル）への参照
         log_file (TextIO): Markdownファイルへのファイルハンドル
@@ -75,23 +130,33 @@ class MarkdownLogger:
             filename (str or Path): 出力先のMarkdownファイルパス
         """
         self.terminal = sys.stdout
-        self.log_file = open(filename, 'w', encoding='utf-8')
+        self.log_file = open(filename, 'w', encoding='utf-8', buffering=1 << 16)
+        # 改行が来るまでファイルへの書き込みを保留するバッファ
+        self._buf = []
         
     def write(self, message):
         """
         メッセージを標準出力とファイルの両方に書き込む
         
+        ファイルへは改行を含むメッセージが来た時点でまとめて書き込む
+        
         Args:
             message (str): 書き込むメッセージ
         """
         self.terminal.write(message)
-        self.log_file.write(message)
+        self._buf.append(message)
+        if '\n' in message:
+            self.log_file.write(''.join(self._buf))
+            self._buf.clear()
         
     def flush(self):
         """
         バッファをフラッシュして、保留中のデータを書き込む
         """
         self.terminal.flush()
+        if self._buf:
+            self.log_file.write(''.join(self._buf))
+            self._buf.clear()
         self.log_file.flush()
         
     def close(self):
@@ -101,6 +166,7 @@ class MarkdownLogger:
         Note:
             このメソッドを呼び出す前に、sys.stdoutを元に戻すことを推奨
         """
+        self.flush()
         self.log_file.close()
 
 
@@ -113,13 +179,14 @@ def format_amount(value, currency='USD'):
     
     処理の流れ：
         1. None値は "0" として返す
-        2. 文字列の場合：
-           - Decimalに変換して絶対値が0.01未満なら "0" または "0.00"
-           - それ以外はそのまま返す
-        3. 数値（int/float）の場合：
+        2. 数値（int/float）の場合（Decimalは使用しない）：
            - 絶対値が0.01未満なら "0" または "0.00"
            - floatの場合はカンマ区切り+小数点2桁でフォーマット（JPYの場合は小数点なし）
            - intの場合は文字列に変換
+        3. 文字列の場合：
+           - 通常の10進数表記なら桁を見るだけで0.01未満かを判定
+           - それ以外（指数表記など）はDecimalに変換して絶対値が0.01未満なら "0" または "0.00"
+           - それ以外はそのまま返す
         4. その他の型：文字列に変換
     
     Args:
@@ -145,41 +212,53 @@ def format_amount(value, currency='USD'):
     if value is None:
         return "0"
     
+    # 通貨の判定は1回だけ行う
+    is_jpy = currency == _JPY
+    
     try:
+        # 数値（int または float）の場合の処理
+        # Decimalを経由せずにそのまま比較・整形する
+        if isinstance(value, (int, float)):
+            # 0.01未満の値は実質的に0として扱う
+            if abs(value) < 0.01:
+                # JPYの場合は小数点なし、それ以外は小数点付き
+                return "0" if is_jpy or isinstance(value, int) else "0.00"
+            
+            # JPY（日本円）の場合は小数点なしでフォーマット
+            if is_jpy:
+                return f"{value:,.0f}"
+            
+            # floatの場合はカンマ区切り+小数点2桁でフォーマット
+            # intの場合は文字列に変換
+            return f"{value:,.2f}" if isinstance(value, float) else str(value)
+        
         # 文字列の場合の処理
         if isinstance(value, str):
+            # 高速パス: 通常の10進数表記（例: "1234.56"）はDecimalを使わず
+            # 整数部と小数第2位までの桁だけで0.01以上かどうかを判定する
+            if _PLAIN_NUM.match(value):
+                int_part, _, frac_part = value.lstrip('-').partition('.')
+                if int_part.strip('0') or frac_part[:2].strip('0'):
+                    return str(int(float(value))) if is_jpy else value
+                return "0" if is_jpy or '.' not in value else "0.00"
+            
             # 科学的記数法または非常に小さい値を0として扱う
             # Decimalを使用することで高精度な数値比較が可能
             decimal_value = Decimal(value)
             
             # 0.01未満の値は実質的に0として扱う
-            if abs(decimal_value) < Decimal('0.01'):
+            if abs(decimal_value) < _CENT:
                 # JPY（日本円）の場合は小数点なし
-                return "0" if currency == 'JPY' or 'JPY' in str(value) or not '.' in value else "0.00"
+                return "0" if is_jpy or '.' not in value else "0.00"
             
             # 0.01以上の値の場合
             # JPYの場合は小数点なしで返す
-            if currency == 'JPY' or 'JPY' in str(value):
+            if is_jpy:
                 return str(int(float(value)))
             
             # それ以外はそのまま返す
             return value
         
-        # 数値（int または float）の場合の処理
-        if isinstance(value, (int, float)):
-            # 0.01未満の値は実質的に0として扱う
-            if abs(value) < 0.01:
-                # JPYの場合は小数点なし、それ以外は小数点付き
-                return "0" if currency == 'JPY' or isinstance(value, int) else "0.00"
-            
-            # JPY（日本円）の場合は小数点なしでフォーマット
-            if currency == 'JPY':
-                return f"{int(value):,}"
-            
-            # floatの場合はカンマ区切り+小数点2桁でフォーマット
-            # intの場合は文字列に変換
-            return f"{value:,.2f}" if isinstance(value, float) else str(value)
-        
         # その他の型の場合は文字列に変換
         return str(value)
     
@@ -188,82 +267,70 @@ def format_amount(value, currency='USD'):
         return str(value)
 
 
-def load_env_file():
+class _PosNumbers(NamedTuple):
+    """ポジションの数値項目（_normalize_pos() で一度だけ float に変換した値）"""
+    quantity: float
+    market_value: float
+    cost_price: float
+    last_price: float
+    unrealized_pl: Optional[float]
+    unrealized_pl_rate: Optional[float]
+
+
+def _to_float(value):
+    """空の値（None, '', 0）は 0.0、それ以外は float に変換する"""
+    return float(value) if value else 0.0
+
+
+def _normalize_pos(pos):
     """
-    .envファイルから環境変数を読み込む関数
+    ポジション情報を既知のキー名に正規化する
     
-    この関数は、スクリプトと同じディレクトリにある .env ファイルを
-    探し、その中に記載されている環境変数を os.environ に設定します。
+    _POS_ALIASES の別名を一度だけ走査し、以降は固定のキー名で
+    値を参照できる辞書を返します。
     
-    .env ファイルの形式：
-        # コメント行
-        WEBULL_APP_KEY=your_app_key
-        WEBULL_APP_SECRET="your_app_secret"
-        
-    処理の流れ：
-        1. スクリプトのディレクトリパスを取得
-        2. .env ファイルの存在を確認
-        3. ファイルが存在する場合：
-           - 各行を読み込み
-           - コメント行（#で始まる）と空行をスキップ
-           - KEY=VALUE 形式をパースして環境変数に設定
-           - 引用符（"または'）があれば除去
-           - 既存の環境変数は上書きしない
-        4. ファイルが存在しない場合：
-           - 警告メッセージを表示
-    
-    Note:
-        既に環境変数が設定されている場合、.envファイルの値で
-        上書きしません。これにより、システム環境変数が優先されます。
+    数値項目はここで一度だけ float に変換し、'numbers' に格納します。
+    変換できない値が含まれる場合、'numbers' は None になります。
     
-    Returns:
-        None
+    Args:
+        pos (dict): APIから返されたポジション情報
     
-    Raises:
-        なし（エラーが発生しても処理を継続）
+    Returns:
+        dict: 正規化されたポジション情報
+              （quantity, market_value, cost_price, last_price,
+                unrealized_pl, unrealized_pl_rate, ticker, symbol, numbers）
     """
-    # スクリプトのディレクトリを取得
-    # __file__ は現在実行中のスクリプトのパス
-    # .parent で親ディレクトリを取得
-    # .resolve() で絶対パスに変換
-    script_dir = Path(__file__).parent.resolve()
-    env_file = script_dir / '.env'
-    
-    # .envファイルの存在確認
-    if env_file.exists():
-        # UTF-8エンコーディングでファイルを開く（メッセージは出力しない）
-        with open(env_file, 'r', encoding='utf-8') as f:
-            # ファイルの各行を処理
-            for line in f:
-                # 前後の空白を除去
-                line = line.strip()
-                
-                # コメント行（#で始まる）と空行をスキップ
-                if line and not line.startswith('#'):
-                    # KEY=VALUE形式をパース
-                    if '=' in line:
-                        # 最初の = で分割（値に = が含まれる可能性を考慮）
-                        key, value = line.split('=', 1)
-                        
-                        # キーと値の前後の空白を除去
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        # 引用符の除去処理
-                        # ダブルクォート（"）で囲まれている場合
-                        if value.startswith('"') and value.endswith('"'):
-                            value = value[1:-1]
-                        # シングルクォート（'）で囲まれている場合
-                        elif value.startswith("'") and value.endswith("'"):
-                            value = value[1:-1]
-                        
-                        # 環境変数に設定（既存の環境変数は上書きしない）
-                        # キーと値が空でなく、かつ既存の環境変数が設定されていない場合のみ
-                        if key and value and not os.getenv(key):
-                            os.environ[key] = value
+    normalized = {}
+    for field, keys in _POS_ALIASES.items():
+        for key in keys:
+            if key in pos:
+                normalized[field] = pos[key]
+                break
+        else:
+            normalized[field] = _POS_DEFAULTS[field]
+    
+    # ticker情報はネストされたオブジェクトで返される場合がある
+    normalized['ticker'] = pos.get('ticker', {})
+    normalized['symbol'] = pos.get('symbol', 'N/A')
+    
+    # 数値項目の変換（1ポジションにつき1回だけ行う）
+    try:
+        unrealized_pl = normalized['unrealized_pl']
+        unrealized_pl_rate = normalized['unrealized_pl_rate']
+        normalized['numbers'] = _PosNumbers(
+            quantity=_to_float(normalized['quantity']),
+            market_value=_to_float(normalized['market_value']),
+            cost_price=_to_float(normalized['cost_price']),
+            last_price=_to_float(normalized['last_price']),
+            unrealized_pl=float(unrealized_pl) if unrealized_pl is not None else None,
+            unrealized_pl_rate=float(unrealized_pl_rate) if unrealized_pl_rate is not None else None,
+        )
+    except (ValueError, TypeError):
+        normalized['numbers'] = None
+    return normalized
 
 
-def display_asset_info(app_key: str, app_secret: str):
+def display_asset_info(app_key: str, app_secret: str, use_cache: bool = True):
     """
     Webull口座の資産情報を取得して表示する関数
     
@@ -279,6 +346,7 @@ def display_asset_info(app_key: str, app_secret: str):
                       https://www.webull.co.jp/center で取得可能
         app_secret (str): Webull OpenAPI アプリケーションシークレット
                          https://www.webull.co.jp/center で取得可能
+        use_cache (bool): 口座一覧のディスクキャッシュを使用するか
     
     Returns:
         None
@@ -299,6 +367,9 @@ def display_asset_info(app_key: str, app_secret: str):
     api_client = ApiClient(app_key, app_secret, Region.JP.value)
     api = API(api_client)
     
+    # API呼び出し間でHTTP接続（keep-alive）を再利用する
+    enable_connection_pooling()
+    
     # ========================================
     # ヘッダー表示
     # ========================================
@@ -312,70 +383,91 @@ def display_asset_info(app_key: str, app_secret: str):
         # 1. 口座サブスクリプション情報の取得
         # ========================================
         # このAPIは、ユーザーが利用可能な口座のリストを返します
+        # 直近に取得済みであればディスクキャッシュから読み込む
         print("📋 口座情報を取得中...")
-        response = api.account.get_app_subscriptions()
+        subscriptions, response = cached_subscriptions(api, app_key, use_cache=use_cache)
         
         # HTTPステータスコードの確認
         # 200以外の場合はエラー
-        if response.status_code != 200:
+        if subscriptions is None:
             print(f"❌ エラー: 口座情報の取得に失敗しました (ステータスコード: {response.status_code})")
             print(f"レスポンス: {response.text}")
             return
         
-        # JSON形式でレスポンスをパース
-        subscriptions = response.json()
-        
         # 口座が存在しない場合のエラーハンドリング
         if not subscriptions:
             print("❌ エラー: 有効な口座が見つかりませんでした")
             return
         
         # 取得した口座数を表示
-        print(f"✅ {len(subscriptions)}件の口座が見つかりました\n")
+        n_accounts = len(subscriptions)
+        print(f"✅ {n_accounts}件の口座が見つかりました\n")
         
         # ========================================
-        # 各口座の詳細情報を取得・表示
+        # 全口座の残高・ポジションを並行して取得
+        # ========================================
+        # API呼び出しはネットワーク待ちが大半のため、スレッドで同時に発行し
+        # 待ち時間を重ね合わせる（表示は下のループで口座順に行う）
+        executor = ThreadPoolExecutor(max_workers=min(16, 2 * n_accounts))
+        fetches = [
+            (
+                executor.submit(call_api, api.account, 'get_account_balance', account.get('account_id'), 'USD'),
+                executor.submit(call_api, api.account, 'get_account_position', account.get('account_id')),
+            )
+            for account in subscriptions
+        ]
+        executor.shutdown(wait=False)
+        
+        # ========================================
+        # 各口座の詳細情報を表示
         # ========================================
         # enumerate()を使用して、口座番号とデータを同時に取得
         # 1から番号を開始（ユーザー向けの表示のため）
-        for idx, account in enumerate(subscriptions, 1):
+        for idx, (account, (balance_future, positions_future)) in enumerate(zip(subscriptions, fetches), 1):
             # 口座IDの取得
             account_id = account.get('account_id')
             
+            # 口座ごとの出力は行リストに溜めて、最後に1回の print で出力する
+            out = []
+            emit = out.append
+            
             # ========================================
             # 口座の基本情報を表示
             # ========================================
-            print(f"\n{'=' * 60}")
-            print(f"## 口座 #{idx}")
-            print(f"{'=' * 60}")
-            print(f"**口座ID**: {account_id}\n")
+            emit(f"\n{'=' * 60}")
+            emit(f"## 口座 #{idx}")
+            emit(f"{'=' * 60}")
+            emit(f"**口座ID**: {account_id}\n")
             
             # 口座ID以外のその他の情報がある場合は表示
             if len(account) > 1:
-                print("### その他の口座情報")
+                emit("### その他の口座情報")
                 for key, value in account.items():
                     if key != 'account_id':
-                        print(f"- {key}: {value}")
-                print()
+                        emit(f"- {key}: {value}")
+                emit("")
             
             # ========================================
             # 2. 口座残高の取得
             # ========================================
-            print(f"### 💰 口座残高")
+            emit(f"### 💰 口座残高")
             try:
                 # 通貨パラメータの指定
                 # 'USD': 米ドル建て残高を取得
                 # 'JPY': 日本円建て残高を取得（利用可能な場合）
-                balance_response = api.account.get_account_balance(account_id, 'USD')
+                # 取得は上で並行して発行済みのため、ここでは結果を待つだけ
+                balance_response = balance_future.result()
+                if isinstance(balance_response, Exception):
+                    raise balance_response
                 
                 # HTTPステータスコードの確認
                 if balance_response.status_code == 200:
                     # JSONレスポンスをパース
-                    balance_data = balance_response.json()
+                    balance_data = loads(balance_response.content)
                     
                     # 口座IDの表示（確認用）
                     if 'account_id' in balance_data:
-                        print(f"\n**口座ID**: {balance_data['account_id']}\n")
+                        emit(f"\n**口座ID**: {balance_data['account_id']}\n")
                     
                     # ========================================
                     # 通貨別の資産情報を表示
@@ -387,29 +479,17 @@ def display_asset_info(app_key: str, app_secret: str):
                             currency = currency_asset.get('currency', 'N/A')
                             
                             # Markdown形式のテーブルで情報を整形
-                            print(f"#### 💱 {currency} 建て\n")
-                            print(f"| 項目 | 金額 |")
-                            print(f"|------|------|")
+                            emit(f"#### 💱 {currency} 建て\n")
+                            emit(f"| 項目 | 金額 |")
+                            emit(f"|------|------|")
                             
                             # 各項目を format_amount() で整形して表示
-                            # total_cash: 総現金残高
-                            print(f"| 総現金 | {format_amount(currency_asset.get('total_cash', '0'), currency)} |")
-                            
-                            # settled_cash: 確定済み現金（取引完了済み）
-                            print(f"| 確定現金 | {format_amount(currency_asset.get('settled_cash', '0'), currency)} |")
-                            
-                            # unsettled_cash: 未確定現金（取引処理中）
-                            print(f"| 未確定現金 | {format_amount(currency_asset.get('unsettled_cash', '0'), currency)} |")
-                            
-                            # frozen_cash: 凍結資金（注文中など）
-                            print(f"| 凍結資金 | {format_amount(currency_asset.get('frozen_cash', '0'), currency)} |")
-                            
-                            # available_to_withdraw: 出金可能額
-                            print(f"| 出金可能額 | {format_amount(currency_asset.get('available_to_withdraw', '0'), currency)} |")
-                            
-                            # stock_power: 買付余力（株式購入可能額）
-                            print(f"| 買付余力 | {format_amount(currency_asset.get('stock_power', '0'), currency)} |")
-                            print()
+                            # （項目名とキーの対応は _BALANCE_ROWS を参照）
+                            emit('\n'.join(
+                                f"| {label} | {format_amount(currency_asset.get(key, '0'), currency)} |"
+                                for label, key in _BALANCE_ROWS
+                            ))
+                            emit("")
                     
                     # ========================================
                     # その他の残高情報（存在する場合）
@@ -419,32 +499,34 @@ def display_asset_info(app_key: str, app_secret: str):
                                  if k not in ['account_id', 'account_currency_assets']}
                     
                     if other_info:
-                        print("#### その他の残高情報\n")
+                        emit("#### その他の残高情報\n")
                         for key, value in other_info.items():
-                            print(f"- {key}: {value}")
-                        print()
+                            emit(f"- {key}: {value}")
+                        emit("")
                 else:
                     # 残高取得が失敗した場合のエラー表示
-                    print(f"\n⚠️  残高情報の取得に失敗しました (ステータスコード: {balance_response.status_code})")
-                    print(f"レスポンス: {balance_response.text}\n")
+                    emit(f"\n⚠️  残高情報の取得に失敗しました (ステータスコード: {balance_response.status_code})")
+                    emit(f"レスポンス: {balance_response.text}\n")
             
             except Exception as e:
                 # 残高取得中の例外をキャッチして表示
-                print(f"\n⚠️  残高取得中にエラーが発生しました: {str(e)}\n")
+                emit(f"\n⚠️  残高取得中にエラーが発生しました: {str(e)}\n")
             
             # ========================================
             # 3. ポジション情報の取得（保有銘柄）
             # ========================================
-            print(f"### 📈 保有ポジション")
+            emit(f"### 📈 保有ポジション")
             try:
                 # ポジション情報APIの呼び出し
                 # このAPIは保有している株式・ETFなどの情報を返す
-                positions_response = api.account.get_account_position(account_id)
+                positions_response = positions_future.result()
+                if isinstance(positions_response, Exception):
+                    raise positions_response
                 
                 # HTTPステータスコードの確認
                 if positions_response.status_code == 200:
                     # JSONレスポンスをパース
-                    positions_data = positions_response.json()
+                    positions_data = loads(positions_response.content)
                     
                     # ========================================
                     # レスポンス形式の正規化
@@ -479,16 +561,20 @@ def display_asset_info(app_key: str, app_secret: str):
                     valid_positions = []
                     
                     for pos in positions:
-                        # 数量フィールドの取得
-                        # APIによって 'position' または 'quantity' のキーが使われる
-                        quantity = pos.get('position', pos.get('quantity', 0))
+                        # キー名の揺れを一度だけ吸収する
+                        # （以降は正規化済みの辞書のみを参照）
+                        # 数値への変換もここで済ませる
+                        pos = _normalize_pos(pos)
+                        numbers = pos['numbers']
                         
+                        # 数量が0より大きい場合のみ有効なポジションとして追加
+                        # 他の数値項目が変換できない場合も、判定は数量のみで行う
+                        if numbers is not None:
+                            if numbers.quantity > 0:
+                                valid_positions.append(pos)
+                            continue
                         try:
-                            # 数量を浮動小数点数に変換
-                            quantity_float = float(quantity) if quantity else 0
-                            
-                            # 数量が0より大きい場合のみ有効なポジションとして追加
-                            if quantity_float > 0:
+                            if _to_float(pos['quantity']) > 0:
                                 valid_positions.append(pos)
                         except (ValueError, TypeError):
                             # 数量が取得できない場合もリストに含める
@@ -498,8 +584,9 @@ def display_asset_info(app_key: str, app_secret: str):
                     # ========================================
                     # 有効なポジションの表示
                     # ========================================
-                    if valid_positions and len(valid_positions) > 0:
-                        print(f"\n🎯 **保有銘柄**: {len(valid_positions)}件\n")
+                    n_valid = len(valid_positions)
+                    if n_valid:
+                        emit(f"\n🎯 **保有銘柄**: {n_valid}件\n")
                         
                         # 各ポジションの詳細情報を表示
                         for pos_idx, pos in enumerate(valid_positions, 1):
@@ -508,146 +595,124 @@ def display_asset_info(app_key: str, app_secret: str):
                             # ティッカーシンボルと銘柄名の取得
                             # ========================================
                             # ticker情報はネストされたオブジェクトで返される場合がある
-                            ticker_info = pos.get('ticker', {})
+                            ticker_info = pos['ticker']
                             
                             # シンボル（銘柄コード）の取得
                             # 例: AAPL, TSLA, VOO など
-                            symbol = ticker_info.get('symbol', pos.get('symbol', 'N/A'))
+                            symbol = ticker_info.get('symbol', pos['symbol'])
                             
                             # ========================================
-                            # 数量と価格情報の取得
+                            # 数量・価格・損益情報の取得
                             # ========================================
-                            # APIによって異なるキー名が使用される可能性に対応
-                            # camelCase と snake_case の両方をチェック
-                            
-                            # 保有数量
-                            quantity = pos.get('position', pos.get('quantity', 0))
-                            
-                            # 現在の市場評価額（現在価格 × 数量）
-                            market_value = pos.get('marketValue', pos.get('market_value', 0))
-                            
-                            # 取得単価（購入時の平均単価）
-                            cost_price = pos.get('costPrice', pos.get('cost_price', pos.get('cost', 0)))
-                            
-                            # 現在価格（最新の市場価格）
-                            last_price = pos.get('lastPrice', pos.get('last_price', 0))
-                            
-                            # ========================================
-                            # 損益情報の取得
-                            # ========================================
-                            # 未実現損益（まだ売却していない利益/損失）
-                            unrealized_pl = pos.get('unrealizedProfitLoss', 
-                                                   pos.get('unrealized_profit_loss', None))
-                            
-                            # 未実現損益率（パーセンテージ）
-                            unrealized_pl_rate = pos.get('unrealizedProfitLossRate', 
-                                                        pos.get('unrealized_profit_loss_rate', None))
+                            # キー名の違いは _normalize_pos() で吸収済み
+                            quantity = pos['quantity']              # 保有数量
+                            market_value = pos['market_value']      # 現在の市場評価額
+                            cost_price = pos['cost_price']          # 取得単価
+                            last_price = pos['last_price']          # 現在価格
                             
                             # ========================================
                             # ポジション情報のMarkdown形式での表示
                             # ========================================
-                            print(f"#### 銘柄 #{pos_idx}: {symbol}\n")
+                            emit(f"#### 銘柄 #{pos_idx}: {symbol}\n")
                             
                             # 銘柄名があれば表示（日本語名や正式名称）
                             if 'name' in ticker_info:
-                                print(f"**銘柄名**: {ticker_info['name']}\n")
+                                emit(f"**銘柄名**: {ticker_info['name']}\n")
                             
                             # Markdownテーブルのヘッダー
-                            print(f"| 項目 | 値 |")
-                            print(f"|------|------|")
+                            emit(f"| 項目 | 値 |")
+                            emit(f"|------|------|")
                             
                             # 保有数量の表示
-                            print(f"| 数量 | {quantity} |")
+                            emit(f"| 数量 | {quantity} |")
                             
                             # ========================================
                             # 価格情報と損益の計算・表示
                             # ========================================
-                            try:
-                                # 文字列や None を float に変換
-                                cost_price_float = float(cost_price) if cost_price else 0
-                                last_price_float = float(last_price) if last_price else 0
-                                market_value_float = float(market_value) if market_value else 0
-                                quantity_float = float(quantity) if quantity else 0
-                                
+                            numbers = pos['numbers']
+                            if numbers is not None:
                                 # ========================================
                                 # 価格情報の表示
                                 # ========================================
                                 # 現在価格（最新の市場価格）
-                                if last_price_float > 0:
-                                    print(f"| 現在価格 | ${last_price_float:,.2f} |")
+                                if numbers.last_price > 0:
+                                    emit(f"| 現在価格 | ${numbers.last_price:,.2f} |")
                                 
                                 # 取得単価（購入時の平均価格）
-                                if cost_price_float > 0:
-                                    print(f"| 取得単価 | ${cost_price_float:,.2f} |")
+                                if numbers.cost_price > 0:
+                                    emit(f"| 取得単価 | ${numbers.cost_price:,.2f} |")
                                 
                                 # 評価額（現在価格 × 数量）
-                                if market_value_float > 0:
-                                    print(f"| 評価額 | ${market_value_float:,.2f} |")
+                                if numbers.market_value > 0:
+                                    emit(f"| 評価額 | ${numbers.market_value:,.2f} |")
                                 
                                 # ========================================
                                 # 損益の計算と表示
                                 # ========================================
                                 # 方法1: APIが損益データを提供している場合
-                                if unrealized_pl is not None and unrealized_pl_rate is not None:
+                                if numbers.unrealized_pl is not None and numbers.unrealized_pl_rate is not None:
                                     # 未実現損益の金額
-                                    pl_float = float(unrealized_pl)
+                                    pl_float = numbers.unrealized_pl
                                     
                                     # 未実現損益率をパーセンテージに変換
                                     # （APIは小数で返す場合があるため100倍）
-                                    pl_rate_float = float(unrealized_pl_rate) * 100
+                                    pl_rate_float = numbers.unrealized_pl_rate * 100
                                     
                                     # 利益か損失かによって絵文字を変更
                                     pl_sign = "📈" if pl_float >= 0 else "📉"
                                     
                                     # 損益を表示（+/- 記号付き）
-                                    print(f"| 損益 | {pl_sign} ${pl_float:,.2f} ({pl_rate_float:+.2f}%) |")
+                                    emit(f"| 損益 | {pl_sign} ${pl_float:,.2f} ({pl_rate_float:+.2f}%) |")
                                 
                                 # 方法2: 損益データがない場合は手動で計算
-                                elif cost_price_float > 0 and last_price_float > 0 and quantity_float > 0:
+                                elif numbers.cost_price > 0 and numbers.last_price > 0 and numbers.quantity > 0:
                                     # 損益計算の公式:
                                     # 損益 = (現在価格 - 取得単価) × 数量
-                                    profit_loss = (last_price_float - cost_price_float) * quantity_float
+                                    profit_loss = (numbers.last_price - numbers.cost_price) * numbers.quantity
                                     
                                     # 損益率の計算:
                                     # 損益率 = ((現在価格 - 取得単価) / 取得単価) × 100
-                                    profit_loss_pct = ((last_price_float - cost_price_float) / cost_price_float * 100)
+                                    profit_loss_pct = ((numbers.last_price - numbers.cost_price) / numbers.cost_price * 100)
                                     
                                     # 利益か損失かによって絵文字を変更
                                     pl_sign = "📈" if profit_loss >= 0 else "📉"
                                     
                                     # 損益を表示（+/- 記号付き）
-                                    print(f"| 損益 | {pl_sign} ${profit_loss:,.2f} ({profit_loss_pct:+.2f}%) |")
+                                    emit(f"| 損益 | {pl_sign} ${profit_loss:,.2f} ({profit_loss_pct:+.2f}%) |")
                             
-                            except (ValueError, TypeError) as e:
+                            else:
                                 # ========================================
                                 # 数値変換エラーの処理
                                 # ========================================
                                 # 価格データが不正な形式の場合は、生の値をそのまま表示
                                 if cost_price:
-                                    print(f"| 取得単価 | {cost_price} |")
+                                    emit(f"| 取得単価 | {cost_price} |")
                                 if last_price:
-                                    print(f"| 現在価格 | {last_price} |")
+                                    emit(f"| 現在価格 | {last_price} |")
                                 if market_value:
-                                    print(f"| 評価額 | {market_value} |")
+                                    emit(f"| 評価額 | {market_value} |")
                             
                             # 銘柄間の区切り
-                            print()
+                            emit("")
                     else:
                         # ========================================
                         # ポジションが存在しない場合
                         # ========================================
-                        print("\n📭 保有ポジションはありません\n")
+                        emit("\n📭 保有ポジションはありません\n")
                 else:
                     # ========================================
                     # ポジション取得が失敗した場合
                     # ========================================
-                    print(f"\n⚠️  ポジション情報の取得に失敗しました (ステータスコード: {positions_response.status_code})\n")
+                    emit(f"\n⚠️  ポジション情報の取得に失敗しました (ステータスコード: {positions_response.status_code})\n")
             
             except Exception as e:
                 # ========================================
                 # ポジション取得中の例外処理
                 # ========================================
-                print(f"\n⚠️  ポジション取得中にエラーが発生しました: {str(e)}\n")
+                emit(f"\n⚠️  ポジション取得中にエラーが発生しました: {str(e)}\n")
+            
+            # 口座1件分をまとめて出力
+            print('\n'.join(out))
         
         # ========================================
         # 完了メッセージの表示
@@ -689,6 +754,11 @@ def main():
         - カレントディレクトリに .md ファイルを作成
     """
     
+    # ========================================
+    # コマンドライン引数の解析
+    # ========================================
+    args = parse_args()
+    
     # ========================================
     # 出力ファイル名の決定
     # ========================================
@@ -731,7 +801,7 @@ def main():
         # 環境変数の読み込み
         # ========================================
         # .envファイルから環境変数を読み込む
-        load_env_file()
+        load_env_file(verbose=False)
         
         # ========================================
         # APIキーの取得
@@ -781,7 +851,7 @@ def main():
         # 資産情報の取得と表示
         # ========================================
         # メイン処理: Webull APIから資産情報を取得して表示
-        display_asset_info(app_key, app_secret)
+        display_asset_info(app_key, app_secret, use_cache=not args.refresh)
         
         # ========================================
         # フッターの出力
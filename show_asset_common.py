@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Webull Japan API - 資産表示スクリプト共通処理
+show_asset_v1.py / show_asset_v2.py で共有する処理をまとめたモジュール
+
+- .envファイルの読み込みと認証情報の確認
+- SDK呼び出しの共通処理（接続の再利用、再試行、口座一覧のキャッシュ）
+- 金額の整形
+
+SDK（webullsdkcore）は実際にAPIを呼び出すときにだけ読み込みます。
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import random
+import hashlib
+import argparse
+from functools import lru_cache, wraps
+from pathlib import Path
+
+logger = logging.getLogger('webull.show_asset')
+
+# 非対話実行（パイプ・cron など）または WEBULL_QUIET 指定時は
+# APIキーの確認表示や区切り線などの装飾出力を省略する
+QUIET = not sys.stdout.isatty() or bool(os.environ.get('WEBULL_QUIET'))
+
+# 区切り線（表示のたびに生成しないようモジュール読み込み時に1回だけ作る）
+HR_EQ = "=" * 60
+HR_DASH = "-" * 40
+
+# レスポンスのJSON解析には orjson があれば使用する
+# （環境変数 WEBULL_NO_ORJSON を設定すると標準の json を使用）
+try:
+    if os.getenv('WEBULL_NO_ORJSON'):
+        raise ImportError
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+
+def format_amount(value):
+    """
+    金額を整形する関数
+    科学的記数法（0E-10など）を0に変換
+    0.01未満の判定は Decimal を使わず float で行う（出力は2桁までのため精度は十分）
+    """
+    if value is None:
+        return "0"
+    
+    if not isinstance(value, (str, int, float)):
+        return str(value)
+    
+    try:
+        # 文字列も数値も float で大きさを判定する（"0E-10" なども変換可能）
+        v = float(value)
+    except ValueError:
+        return str(value)
+    
+    # 0.01未満の値は実質的に0として扱う
+    if -0.01 < v < 0.01:
+        if isinstance(value, str):
+            return "0" if '.' not in value else "0.00"
+        return "0" if isinstance(value, int) else "0.00"
+    
+    # 文字列はそのまま、floatはカンマ区切り+小数点2桁、intは文字列に変換
+    if isinstance(value, str):
+        return value
+    return f"{value:,.2f}" if isinstance(value, float) else str(value)
+
+
+# .envファイル全体から KEY=VALUE 行を抽出する正規表現
+# 値は "..." / '...' / 引用符なし のいずれか。空白に続く # 以降はコメントとして無視する
+_ENV_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|(.*?))[ \t]*(?:[ \t]#.*)?$""",
+    re.MULTILINE,
+)
+
+
+@lru_cache(maxsize=1)
+def _read_env_pairs(env_file):
+    """
+    .envファイルを一度だけ読み込み、(KEY, VALUE) のタプルを返す
+    同じパスに対する2回目以降の呼び出しはキャッシュを返す
+    """
+    text = env_file.read_text(encoding='utf-8')
+    # 値は "..." / '...' / 引用符なし のうち一致したグループ（m.lastindex）から取り出す
+    # 引用符の判定・除去は正規表現側で済んでいるため、ここでは行わない
+    return tuple((m.group(1), m.group(m.lastindex)) for m in _ENV_RE.finditer(text))
+
+
+def load_env_file(verbose=True):
+    """
+    .envファイルから環境変数を読み込む
+    スクリプトと同じディレクトリの.envファイルを探す
+    
+    Args:
+        verbose: False の場合は読み込み状況のメッセージを出力しない
+                 （レポートだけを出力する show_asset.py から使用）
+    """
+    # スクリプトのディレクトリを取得
+    script_dir = Path(__file__).parent.resolve()
+    env_file = script_dir / '.env'
+    
+    if env_file.exists():
+        if verbose and not QUIET:
+            print(f"📄 .envファイルを読み込んでいます: {env_file}")
+        # 設定済みの環境変数（空でないもの）は一度だけ取得して照合する
+        existing = {k for k, v in os.environ.items() if v}
+        for key, value in _read_env_pairs(env_file):
+            # 環境変数に設定（既存の環境変数は上書きしない）
+            if value and key not in existing:
+                os.environ[key] = value
+                existing.add(key)
+        if verbose and not QUIET:
+            print("✅ .envファイルの読み込みが完了しました\n")
+    elif verbose:
+        print(f"⚠️  .envファイルが見つかりません: {env_file}")
+        print("環境変数または直接設定を使用します\n")
+
+
+def parse_args():
+    """コマンドライン引数を解析し、ログ出力レベルを設定する"""
+    parser = argparse.ArgumentParser(description="Webull Japan - 資産情報表示")
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='口座一覧のキャッシュを使用せず、APIから取得し直す'
+    )
+    args = parser.parse_args()
+    
+    # ログ出力レベル（WEBULL_LOG 環境変数で変更可能）
+    logging.basicConfig(level=os.environ.get('WEBULL_LOG', 'WARNING'))
+    
+    return args
+
+
+def parse_credentials():
+    """
+    .envファイルと環境変数からAPIキーとシークレットを取得する
+    
+    Returns:
+        (app_key, app_secret) のタプル
+        設定されていない場合は設定方法を表示して (None, None) を返す
+    """
+    # .envファイルから環境変数を読み込む
+    load_env_file()
+    
+    # 環境変数から取得
+    app_key = os.getenv('WEBULL_APP_KEY')
+    app_secret = os.getenv('WEBULL_APP_SECRET')
+    
+    # APIキーの確認
+    if not app_key or not app_secret:
+        print("❌ エラー: APIキーとシークレットが設定されていません\n")
+        print("設定方法:")
+        print("\n1. .envファイルを使用（推奨）:")
+        print("   スクリプトと同じディレクトリに.envファイルを作成し、以下の内容を記載:")
+        print("   ---")
+        print("   WEBULL_APP_KEY=your_actual_key")
+        print("   WEBULL_APP_SECRET=your_actual_secret")
+        print("   ---")
+        print("\n2. 環境変数を使用:")
+        print("   export WEBULL_APP_KEY='your_actual_key'")
+        print("   export WEBULL_APP_SECRET='your_actual_secret'")
+        print("\nAPIキーの取得方法:")
+        print("https://www.webull.co.jp/center でOpenAPIを申請してください")
+        return None, None
+    
+    # マスクしたAPIキーの表示は対話的な端末でのみ行う
+    if not QUIET:
+        print(f"🔑 APIキーを確認しました")
+        print(f"   App Key: {app_key[:8]}...{app_key[-4:] if len(app_key) > 12 else ''}")
+        print()
+    
+    return app_key, app_secret
+
+
+def enable_connection_pooling():
+    """
+    SDKのHTTP通信でTCP/TLS接続を再利用するように設定する
+    SDKはリクエストごとにSessionを生成するため、共有Sessionに差し替える
+    """
+    from webullsdkcore.http import response as sdk_http_response
+    from webullsdkcore.vendored.requests import Session
+    from webullsdkcore.vendored.requests.adapters import HTTPAdapter
+    
+    if not hasattr(sdk_http_response, 'Session'):
+        return
+    
+    class _PooledSession(Session):
+        """with文を抜けても閉じられない（コネクションプールを保持する）Session"""
+        
+        def __exit__(self, *args):
+            pass
+    
+    session = _PooledSession()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    sdk_http_response.Session = lambda: session
+
+
+def retry(max_attempts=4, base=0.25, cap=4.0):
+    """
+    HTTP 429 / 5xx で失敗したAPI呼び出しを指数バックオフで再試行するデコレータ
+    
+    SDKは2xx以外のステータスで ServerException を送出するため、
+    例外の HTTP ステータスで判定し、再試行しないエラーと最後の失敗はそのまま送出する
+    
+    Args:
+        max_attempts: 最大試行回数（初回を含む）
+        base: 初回の待機秒数（試行ごとに2倍）
+        cap: 待機秒数の上限
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            from webullsdkcore.exception.exceptions import ServerException
+            
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except ServerException as e:
+                    status = e.get_http_status() or 0
+                    if (status != 429 and status < 500) or attempt == max_attempts - 1:
+                        raise
+                time.sleep(min(cap, base * 2 ** attempt) + random.uniform(0, 0.1))
+        return wrapper
+    return decorator
+
+
+def call_api(target, method, *args):
+    """
+    APIメソッドを呼び出し、レスポンスまたは発生した例外を返す
+    ワーカースレッドで実行し、例外は表示側で再送出する
+    一時的なエラー（429 / 5xx）は retry() で再試行する
+    """
+    try:
+        return retry()(getattr(target, method))(*args)
+    except Exception as e:
+        return e
+
+
+def _scalar_fields(account):
+    """口座情報からスカラー値（文字列・数値・真偽値・None）の項目のみを取り出す"""
+    return {k: v for k, v in account.items()
+            if isinstance(v, (str, int, float, bool)) or v is None}
+
+
+def cached_subscriptions(api, app_key, ttl=86400, use_cache=True):
+    """
+    口座サブスクリプション情報を取得する（ディスクキャッシュ付き）
+    ~/.cache/webull/sub_<App Keyのハッシュ>.json に保存し、TTL以内ならAPIを呼ばない
+    
+    キャッシュには各口座のスカラー値のみを、所有者のみ読み書きできる権限（0o600）で保存する
+    APIから取得した場合も同じ項目だけを返すため、キャッシュの有無で結果は変わらない
+    
+    Returns:
+        (口座リスト, レスポンス) のタプル
+        キャッシュを使用した場合はレスポンスが None、取得失敗時は口座リストが None
+    """
+    cache_path = (Path.home() / '.cache' / 'webull'
+                  / f"sub_{hashlib.sha256(app_key.encode()).hexdigest()[:16]}.json")
+    
+    if use_cache:
+        try:
+            if time.time() - cache_path.stat().st_mtime < ttl:
+                return json.loads(cache_path.read_text(encoding='utf-8')), None
+        except (OSError, ValueError):
+            # キャッシュが存在しない・壊れている場合はAPIから取得する
+            pass
+    
+    response = retry()(api.account.get_app_subscriptions)()
+    if response.status_code != 200:
+        return None, response
+    
+    # ネストした項目は保存・表示の対象外とし、各口座のスカラー値のみを残す
+    subscriptions = [_scalar_fields(account) for account in loads(response.content) or ()]
+    
+    # キャッシュへの保存（失敗しても処理は継続）
+    if subscriptions:
+        try:
+            cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # 他のユーザーから読めないよう、所有者のみ読み書き可能な権限で作成する
+            fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(subscriptions, ensure_ascii=False))
+            # 既存のファイルは作成時の権限が適用されないため、明示的に変更する
+            os.chmod(cache_path, 0o600)
+        except OSError:
+            pass
+    
+    return subscriptions, response
@@ -4,145 +4,164 @@ Webull Japan API - 資産表示スクリプト
 口座残高、ポジション情報、資産サマリーを表示します
 """
 
-import os
-from pathlib import Path
-from webullsdkcore.client import ApiClient
-from webullsdktrade.api import API
-from webullsdkcore.common.region import Region
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from show_asset_common import (
+    HR_DASH,
+    HR_EQ,
+    QUIET,
+    call_api,
+    cached_subscriptions,
+    enable_connection_pooling,
+    loads,
+    logger,
+    parse_args,
+    parse_credentials,
+)
 
-
-def load_env_file():
-    """
-    .envファイルから環境変数を読み込む
-    スクリプトと同じディレクトリの.envファイルを探す
-    """
-    # スクリプトのディレクトリを取得
-    script_dir = Path(__file__).parent.resolve()
-    env_file = script_dir / '.env'
-    
-    if env_file.exists():
-        print(f"📄 .envファイルを読み込んでいます: {env_file}")
-        with open(env_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # コメント行と空行をスキップ
-                if line and not line.startswith('#'):
-                    # KEY=VALUE形式をパース
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        # 引用符を除去
-                        if value.startswith('"') and value.endswith('"'):
-                            value = value[1:-1]
-                        elif value.startswith("'") and value.endswith("'"):
-                            value = value[1:-1]
-                        # 環境変数に設定（既存の環境変数は上書きしない）
-                        if key and value and not os.getenv(key):
-                            os.environ[key] = value
-        print("✅ .envファイルの読み込みが完了しました\n")
-    else:
-        print(f"⚠️  .envファイルが見つかりません: {env_file}")
-        print("環境変数または直接設定を使用します\n")
+# 個別に表示済みのため「その他の情報」から除外するキー
+_ACCOUNT_KNOWN = frozenset({'account_id'})
+_BALANCE_KNOWN = frozenset({'total_asset', 'cash_balance', 'buying_power'})
 
 
-def display_asset_info(app_key: str, app_secret: str):
+def display_asset_info(app_key: str, app_secret: str, use_cache: bool = True):
     """
     Webull口座の資産情報を取得して表示する
     
     Args:
         app_key: WebullアプリケーションキーClaude
         app_secret: Webullアプリケーションシークレット
+        use_cache: 口座一覧のディスクキャッシュを使用するか
     """
     
+    # 出力はすべてバッファに溜め、最後に1回の write で標準出力へ書き出す
+    buf = io.StringIO()
+    
+    def pln(line=''):
+        buf.write(line + '\n')
+    
+    def deco(line=''):
+        # 見出しの区切り線や進捗表示は対話的な端末でのみ出力する
+        if not QUIET:
+            pln(line)
+    
+    # SDKは実際にAPIを呼び出すときにだけ読み込む
+    from webullsdkcore.client import ApiClient
+    from webullsdktrade.api import API
+    from webullsdkcore.common.region import Region
+    
     # APIクライアントの初期化（日本リージョン）
     api_client = ApiClient(app_key, app_secret, Region.JP.value)
     api = API(api_client)
     
-    print("=" * 60)
-    print("Webull Japan - 資産情報表示")
-    print("=" * 60)
-    print()
+    # API呼び出し間でHTTP接続（keep-alive）を再利用する
+    enable_connection_pooling()
+    
+    deco(HR_EQ)
+    deco("Webull Japan - 資産情報表示")
+    deco(HR_EQ)
+    deco()
     
     try:
         # 1. 口座サブスクリプション情報の取得
-        print("📋 口座情報を取得中...")
-        response = api.account.get_app_subscriptions()
+        deco("📋 口座情報を取得中...")
+        subscriptions, response = cached_subscriptions(api, app_key, use_cache=use_cache)
         
-        if response.status_code != 200:
-            print(f"❌ エラー: 口座情報の取得に失敗しました (ステータスコード: {response.status_code})")
-            print(f"レスポンス: {response.text}")
+        if subscriptions is None:
+            pln(f"❌ エラー: 口座情報の取得に失敗しました (ステータスコード: {response.status_code})")
+            pln(f"レスポンス: {response.text}")
             return
         
-        subscriptions = response.json()
-        
         if not subscriptions:
-            print("❌ エラー: 有効な口座が見つかりませんでした")
+            pln("❌ エラー: 有効な口座が見つかりませんでした")
             return
         
-        print(f"✅ {len(subscriptions)}件の口座が見つかりました\n")
+        pln(f"✅ {len(subscriptions)}件の口座が見つかりました\n")
+        
+        # 全口座の残高・ポジションを並行して取得（表示は口座順に行う）
+        executor = ThreadPoolExecutor(max_workers=min(16, 2 * len(subscriptions)))
+        fetches = [
+            (
+                executor.submit(call_api, api.account, 'get_account_balance', account.get('account_id'), 'USD'),
+                executor.submit(call_api, api.account, 'get_account_positions', account.get('account_id')),
+            )
+            for account in subscriptions
+        ]
+        executor.shutdown(wait=False)
         
         # 各口座の情報を表示
         for idx, account in enumerate(subscriptions, 1):
             account_id = account.get('account_id')
-            print(f"\n{'=' * 60}")
-            print(f"口座 #{idx}")
-            print(f"{'=' * 60}")
-            print(f"口座ID: {account_id}")
+            
+            # 取得結果をリストから取り出し、表示後は次の口座の処理で解放されるようにする
+            # （全口座分のレスポンスを最後まで保持しない）
+            balance_future, positions_future = fetches[idx - 1]
+            fetches[idx - 1] = None
+            deco(f"\n{HR_EQ}")
+            pln(f"口座 #{idx}")
+            deco(HR_EQ)
+            pln(f"口座ID: {account_id}")
             
             # その他の口座情報があれば表示
             for key, value in account.items():
-                if key != 'account_id':
-                    print(f"{key}: {value}")
+                if key in _ACCOUNT_KNOWN:
+                    continue
+                pln(f"{key}: {value}")
             
             # 2. 口座残高の取得
-            print(f"\n💰 口座残高を取得中...")
+            deco(f"\n💰 口座残高を取得中...")
             try:
-                # 通貨は'USD'または'JPY'を指定可能
-                balance_response = api.account.get_account_balance(account_id, 'USD')
+                # 第2引数は総資産の表示通貨（通貨別の資産は1回の呼び出しですべて返される）
+                balance_response = balance_future.result()
+                if isinstance(balance_response, Exception):
+                    raise balance_response
                 
                 if balance_response.status_code == 200:
-                    balance_data = balance_response.json()
-                    print("\n📊 残高情報:")
-                    print("-" * 40)
+                    balance_data = loads(balance_response.content)
+                    pln("\n📊 残高情報:")
+                    pln(HR_DASH)
                     
                     # 総資産
                     if 'total_asset' in balance_data:
-                        print(f"総資産: ${balance_data['total_asset']:,.2f}")
+                        pln(f"総資産: ${balance_data['total_asset']:,.2f}")
                     
                     # キャッシュバランス
                     if 'cash_balance' in balance_data:
-                        print(f"現金残高: ${balance_data['cash_balance']:,.2f}")
+                        pln(f"現金残高: ${balance_data['cash_balance']:,.2f}")
                     
                     # 買付可能額
                     if 'buying_power' in balance_data:
-                        print(f"買付余力: ${balance_data['buying_power']:,.2f}")
+                        pln(f"買付余力: ${balance_data['buying_power']:,.2f}")
                     
                     # その他の残高情報
                     for key, value in balance_data.items():
-                        if key not in ['total_asset', 'cash_balance', 'buying_power']:
-                            if isinstance(value, (int, float)):
-                                print(f"{key}: ${value:,.2f}")
-                            else:
-                                print(f"{key}: {value}")
+                        if key in _BALANCE_KNOWN:
+                            continue
+                        if isinstance(value, (int, float)):
+                            pln(f"{key}: ${value:,.2f}")
+                        else:
+                            pln(f"{key}: {value}")
                 else:
-                    print(f"⚠️  残高情報の取得に失敗しました (ステータスコード: {balance_response.status_code})")
-                    print(f"レスポンス: {balance_response.text}")
+                    pln(f"⚠️  残高情報の取得に失敗しました (ステータスコード: {balance_response.status_code})")
+                    pln(f"レスポンス: {balance_response.text}")
             
             except Exception as e:
-                print(f"⚠️  残高取得中にエラーが発生しました: {str(e)}")
+                pln(f"⚠️  残高取得中にエラーが発生しました: {str(e)}")
             
             # 3. ポジション情報の取得（保有銘柄）
-            print(f"\n📈 保有ポジションを取得中...")
+            deco(f"\n📈 保有ポジションを取得中...")
             try:
-                positions_response = api.account.get_account_positions(account_id)
+                positions_response = positions_future.result()
+                if isinstance(positions_response, Exception):
+                    raise positions_response
                 
                 if positions_response.status_code == 200:
-                    positions = positions_response.json()
+                    positions = loads(positions_response.content)
                     
                     if positions and len(positions) > 0:
-                        print(f"\n🎯 保有銘柄 ({len(positions)}件):")
-                        print("-" * 40)
+                        pln(f"\n🎯 保有銘柄 ({len(positions)}件):")
+                        pln(HR_DASH)
                         
                         for pos in positions:
                             symbol = pos.get('symbol', 'N/A')
@@ -156,67 +175,49 @@ def display_asset_info(app_key: str, app_secret: str):
                                 profit_loss = (current_price - cost_price) * quantity
                                 profit_loss_pct = ((current_price - cost_price) / cost_price * 100) if cost_price > 0 else 0
                                 
-                                print(f"\nシンボル: {symbol}")
-                                print(f"  数量: {quantity}")
-                                print(f"  現在価格: ${current_price:,.2f}")
-                                print(f"  取得単価: ${cost_price:,.2f}")
-                                print(f"  評価額: ${market_value:,.2f}")
-                                print(f"  損益: ${profit_loss:,.2f} ({profit_loss_pct:+.2f}%)")
+                                pln(f"\nシンボル: {symbol}")
+                                pln(f"  数量: {quantity}")
+                                pln(f"  現在価格: ${current_price:,.2f}")
+                                pln(f"  取得単価: ${cost_price:,.2f}")
+                                pln(f"  評価額: ${market_value:,.2f}")
+                                pln(f"  損益: ${profit_loss:,.2f} ({profit_loss_pct:+.2f}%)")
                             else:
-                                print(f"\nシンボル: {symbol}")
-                                print(f"  数量: {quantity}")
-                                print(f"  評価額: ${market_value:,.2f}")
+                                pln(f"\nシンボル: {symbol}")
+                                pln(f"  数量: {quantity}")
+                                pln(f"  評価額: ${market_value:,.2f}")
                     else:
-                        print("📭 保有ポジションはありません")
+                        pln("📭 保有ポジションはありません")
                 else:
-                    print(f"⚠️  ポジション情報の取得に失敗しました (ステータスコード: {positions_response.status_code})")
+                    pln(f"⚠️  ポジション情報の取得に失敗しました (ステータスコード: {positions_response.status_code})")
             
             except Exception as e:
-                print(f"⚠️  ポジション取得中にエラーが発生しました: {str(e)}")
+                pln(f"⚠️  ポジション取得中にエラーが発生しました: {str(e)}")
         
-        print(f"\n{'=' * 60}")
-        print("✅ 資産情報の取得が完了しました")
-        print(f"{'=' * 60}\n")
+        deco(f"\n{HR_EQ}")
+        pln("✅ 資産情報の取得が完了しました")
+        deco(f"{HR_EQ}\n")
     
     except Exception as e:
-        print(f"\n❌ エラーが発生しました: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        pln(f"\n❌ エラーが発生しました: {str(e)}")
+        logger.exception("資産情報の取得に失敗しました")
+    
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
 
 
 def main():
     """メイン関数"""
     
-    # .envファイルから環境変数を読み込む
-    load_env_file()
+    args = parse_args()
     
-    # 環境変数から取得
-    app_key = os.getenv('WEBULL_APP_KEY')
-    app_secret = os.getenv('WEBULL_APP_SECRET')
-    
-    # APIキーの確認
-    if not app_key or not app_secret:
-        print("❌ エラー: APIキーとシークレットが設定されていません\n")
-        print("設定方法:")
-        print("\n1. .envファイルを使用（推奨）:")
-        print("   スクリプトと同じディレクトリに.envファイルを作成し、以下の内容を記載:")
-        print("   ---")
-        print("   WEBULL_APP_KEY=your_actual_key")
-        print("   WEBULL_APP_SECRET=your_actual_secret")
-        print("   ---")
-        print("\n2. 環境変数を使用:")
-        print("   export WEBULL_APP_KEY='your_actual_key'")
-        print("   export WEBULL_APP_SECRET='your_actual_secret'")
-        print("\nAPIキーの取得方法:")
-        print("https://www.webull.co.jp/center でOpenAPIを申請してください")
+    # .envファイルと環境変数からAPIキーを取得
+    app_key, app_secret = parse_credentials()
+    if not app_key:
         return
     
-    print(f"🔑 APIキーを確認しました")
-    print(f"   App Key: {app_key[:8]}...{app_key[-4:] if len(app_key) > 12 else ''}")
-    print()
-    
     # 資産情報の表示
-    display_asset_info(app_key, app_secret)
+    display_asset_info(app_key, app_secret, use_cache=not args.refresh)
 
 
 if __name__ == '__main__':
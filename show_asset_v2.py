@@ -4,171 +4,233 @@ Webull Japan API - 資産表示スクリプト
 口座残高、ポジション情報、資産サマリーを表示します
 """
 
-import os
-from pathlib import Path
-from decimal import Decimal
-from webullsdkcore.client import ApiClient
-from webullsdktrade.api import API
-from webullsdkcore.common.region import Region
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from show_asset_common import (
+    HR_DASH,
+    HR_EQ,
+    QUIET,
+    call_api,
+    cached_subscriptions,
+    enable_connection_pooling,
+    format_amount,
+    loads,
+    logger,
+    parse_args,
+    parse_credentials,
+)
 
+# 個別に表示済みのため「その他の情報」から除外するキー
+_ACCOUNT_KNOWN = frozenset({'account_id'})
+_BALANCE_KNOWN = frozenset({'account_id', 'account_currency_assets'})
 
-def format_amount(value):
-    """
-    金額を整形する関数
-    科学的記数法（0E-10など）を0に変換
-    """
-    if value is None:
-        return "0"
-    
-    try:
-        # 文字列の場合
-        if isinstance(value, str):
-            # 科学的記数法または非常に小さい値を0として扱う
-            decimal_value = Decimal(value)
-            if abs(decimal_value) < Decimal('0.01'):
-                return "0" if 'JPY' in str(value) or not '.' in value else "0.00"
-            return value
-        
-        # 数値の場合
-        if isinstance(value, (int, float)):
-            if abs(value) < 0.01:
-                return "0" if isinstance(value, int) else "0.00"
-            return f"{value:,.2f}" if isinstance(value, float) else str(value)
-        
-        return str(value)
-    except:
-        return str(value)
+
+# ポジション表示の行テンプレート
+_POS_FMT = {
+    'symbol': "\nシンボル: {}",
+    'name': "  銘柄名: {}",
+    'quantity': "  数量: {}",
+    'last_price': "  現在価格: ${:,.2f}",
+    'cost_price': "  取得単価: ${:,.2f}",
+    'market_value': "  評価額: ${:,.2f}",
+    'pl': "  損益: ${:,.2f} ({:+.2f}%)",
+}
+
+
+# 通貨別残高の表示行（表示名, APIのキー）
+_BALANCE_ROWS = (
+    ('総現金', 'total_cash'),
+    ('確定現金', 'settled_cash'),
+    ('未確定現金', 'unsettled_cash'),
+    ('凍結資金', 'frozen_cash'),
+    ('出金可能額', 'available_to_withdraw'),
+    ('買付余力', 'stock_power'),
+)
+
+
+def _format_balance(currency_asset):
+    """通貨別残高の6項目を1つの文字列に整形する"""
+    return '\n'.join(
+        f"  {label}: {format_amount(currency_asset.get(key, '0'))}"
+        for label, key in _BALANCE_ROWS
+    )
+
+
+def _to_float(value):
+    """空の値（None, '', 0）は 0.0、それ以外は float に変換する"""
+    return float(value) if value else 0.0
 
 
-def load_env_file():
+# この件数以上の保有銘柄は numpy で数値変換と損益計算をまとめて行う
+_VECTORIZE_MIN = 20
+
+
+def _vectorize_positions(positions):
     """
-    .envファイルから環境変数を読み込む
-    スクリプトと同じディレクトリの.envファイルを探す
+    全ポジションの数量・価格の変換と損益計算を numpy でまとめて行う
+    
+    numpy は件数がしきい値以上のときにだけ読み込む（起動時の読み込み時間を増やさない）
+    
+    Returns:
+        ポジションごとの (数量, 取得単価, 現在価格, 評価額, 損益, 損益率) のリスト
+        numpy がない場合や数値に変換できない値が含まれる場合は None（1件ずつ変換する処理に任せる）
     """
-    # スクリプトのディレクトリを取得
-    script_dir = Path(__file__).parent.resolve()
-    env_file = script_dir / '.env'
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    
+    # 空の値（None, '', 0）は _to_float と同様に 0 として扱う
+    columns = (
+        [pos.get('position') or pos.get('quantity') or 0 for pos in positions],
+        [pos.get('costPrice') or pos.get('cost_price') or pos.get('cost') or 0 for pos in positions],
+        [pos.get('lastPrice') or pos.get('last_price') or 0 for pos in positions],
+        [pos.get('marketValue') or pos.get('market_value') or 0 for pos in positions],
+    )
+    try:
+        qty, cost, last, mv = (np.asarray(col, dtype=np.float64) for col in columns)
+    except (ValueError, TypeError):
+        return None
+    
+    # 損益は取得単価・現在価格・数量がすべて正の銘柄についてのみ使用する
+    valid = (cost > 0) & (last > 0) & (qty > 0)
+    diff = last - cost
+    pl = np.where(valid, diff * qty, 0.0)
+    pl_rate = np.divide(diff, cost, out=np.zeros_like(cost), where=valid) * 100
     
-    if env_file.exists():
-        print(f"📄 .envファイルを読み込んでいます: {env_file}")
-        with open(env_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # コメント行と空行をスキップ
-                if line and not line.startswith('#'):
-                    # KEY=VALUE形式をパース
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        # 引用符を除去
-                        if value.startswith('"') and value.endswith('"'):
-                            value = value[1:-1]
-                        elif value.startswith("'") and value.endswith("'"):
-                            value = value[1:-1]
-                        # 環境変数に設定（既存の環境変数は上書きしない）
-                        if key and value and not os.getenv(key):
-                            os.environ[key] = value
-        print("✅ .envファイルの読み込みが完了しました\n")
-    else:
-        print(f"⚠️  .envファイルが見つかりません: {env_file}")
-        print("環境変数または直接設定を使用します\n")
+    return list(zip(*(a.tolist() for a in (qty, cost, last, mv, pl, pl_rate))))
 
 
-def display_asset_info(app_key: str, app_secret: str):
+def display_asset_info(app_key: str, app_secret: str, use_cache: bool = True):
     """
     Webull口座の資産情報を取得して表示する
     
     Args:
         app_key: WebullアプリケーションキーClaude
         app_secret: Webullアプリケーションシークレット
+        use_cache: 口座一覧のディスクキャッシュを使用するか
     """
     
+    # 出力はすべてバッファに溜め、最後に1回の write で標準出力へ書き出す
+    buf = io.StringIO()
+    
+    def pln(line=''):
+        buf.write(line + '\n')
+    
+    def deco(line=''):
+        # 見出しの区切り線や進捗表示は対話的な端末でのみ出力する
+        if not QUIET:
+            pln(line)
+    
+    # SDKは実際にAPIを呼び出すときにだけ読み込む
+    from webullsdkcore.client import ApiClient
+    from webullsdktrade.api import API
+    from webullsdkcore.common.region import Region
+    
     # APIクライアントの初期化（日本リージョン）
     api_client = ApiClient(app_key, app_secret, Region.JP.value)
     api = API(api_client)
     
-    print("=" * 60)
-    print("Webull Japan - 資産情報表示")
-    print("=" * 60)
-    print()
+    # API呼び出し間でHTTP接続（keep-alive）を再利用する
+    enable_connection_pooling()
+    
+    deco(HR_EQ)
+    deco("Webull Japan - 資産情報表示")
+    deco(HR_EQ)
+    deco()
     
     try:
         # 1. 口座サブスクリプション情報の取得
-        print("📋 口座情報を取得中...")
-        response = api.account.get_app_subscriptions()
+        deco("📋 口座情報を取得中...")
+        subscriptions, response = cached_subscriptions(api, app_key, use_cache=use_cache)
         
-        if response.status_code != 200:
-            print(f"❌ エラー: 口座情報の取得に失敗しました (ステータスコード: {response.status_code})")
-            print(f"レスポンス: {response.text}")
+        if subscriptions is None:
+            pln(f"❌ エラー: 口座情報の取得に失敗しました (ステータスコード: {response.status_code})")
+            pln(f"レスポンス: {response.text}")
             return
         
-        subscriptions = response.json()
-        
         if not subscriptions:
-            print("❌ エラー: 有効な口座が見つかりませんでした")
+            pln("❌ エラー: 有効な口座が見つかりませんでした")
             return
         
-        print(f"✅ {len(subscriptions)}件の口座が見つかりました\n")
+        pln(f"✅ {len(subscriptions)}件の口座が見つかりました\n")
+        
+        # 全口座の残高・ポジションを並行して取得（表示は口座順に行う）
+        executor = ThreadPoolExecutor(max_workers=min(16, 2 * len(subscriptions)))
+        fetches = [
+            (
+                executor.submit(call_api, api.account, 'get_account_balance', account.get('account_id'), 'USD'),
+                executor.submit(call_api, api.account, 'get_account_position', account.get('account_id')),
+            )
+            for account in subscriptions
+        ]
+        executor.shutdown(wait=False)
         
         # 各口座の情報を表示
         for idx, account in enumerate(subscriptions, 1):
             account_id = account.get('account_id')
-            print(f"\n{'=' * 60}")
-            print(f"口座 #{idx}")
-            print(f"{'=' * 60}")
-            print(f"口座ID: {account_id}")
+            
+            # 取得結果をリストから取り出し、表示後は次の口座の処理で解放されるようにする
+            # （全口座分のレスポンスを最後まで保持しない）
+            balance_future, positions_future = fetches[idx - 1]
+            fetches[idx - 1] = None
+            deco(f"\n{HR_EQ}")
+            pln(f"口座 #{idx}")
+            deco(HR_EQ)
+            pln(f"口座ID: {account_id}")
             
             # その他の口座情報があれば表示
             for key, value in account.items():
-                if key != 'account_id':
-                    print(f"{key}: {value}")
+                if key in _ACCOUNT_KNOWN:
+                    continue
+                pln(f"{key}: {value}")
             
             # 2. 口座残高の取得
-            print(f"\n💰 口座残高を取得中...")
+            deco(f"\n💰 口座残高を取得中...")
             try:
-                # 通貨は'USD'または'JPY'を指定可能
-                balance_response = api.account.get_account_balance(account_id, 'USD')
+                # 第2引数は総資産の表示通貨（通貨別の資産は1回の呼び出しですべて返される）
+                balance_response = balance_future.result()
+                if isinstance(balance_response, Exception):
+                    raise balance_response
                 
                 if balance_response.status_code == 200:
-                    balance_data = balance_response.json()
-                    print("\n📊 残高情報:")
-                    print("-" * 40)
+                    balance_data = loads(balance_response.content)
+                    pln("\n📊 残高情報:")
+                    pln(HR_DASH)
                     
                     # 口座ID
                     if 'account_id' in balance_data:
-                        print(f"口座ID: {balance_data['account_id']}")
+                        pln(f"口座ID: {balance_data['account_id']}")
                     
                     # 通貨別の資産情報
                     if 'account_currency_assets' in balance_data:
                         for currency_asset in balance_data['account_currency_assets']:
                             currency = currency_asset.get('currency', 'N/A')
-                            print(f"\n💱 {currency} 建て:")
-                            print(f"  総現金: {format_amount(currency_asset.get('total_cash', '0'))}")
-                            print(f"  確定現金: {format_amount(currency_asset.get('settled_cash', '0'))}")
-                            print(f"  未確定現金: {format_amount(currency_asset.get('unsettled_cash', '0'))}")
-                            print(f"  凍結資金: {format_amount(currency_asset.get('frozen_cash', '0'))}")
-                            print(f"  出金可能額: {format_amount(currency_asset.get('available_to_withdraw', '0'))}")
-                            print(f"  買付余力: {format_amount(currency_asset.get('stock_power', '0'))}")
+                            pln(f"\n💱 {currency} 建て:")
+                            pln(_format_balance(currency_asset))
                     
                     # その他の情報があれば表示
                     for key, value in balance_data.items():
-                        if key not in ['account_id', 'account_currency_assets']:
-                            print(f"{key}: {value}")
+                        if key in _BALANCE_KNOWN:
+                            continue
+                        pln(f"{key}: {value}")
                 else:
-                    print(f"⚠️  残高情報の取得に失敗しました (ステータスコード: {balance_response.status_code})")
-                    print(f"レスポンス: {balance_response.text}")
+                    pln(f"⚠️  残高情報の取得に失敗しました (ステータスコード: {balance_response.status_code})")
+                    pln(f"レスポンス: {balance_response.text}")
             
             except Exception as e:
-                print(f"⚠️  残高取得中にエラーが発生しました: {str(e)}")
+                pln(f"⚠️  残高取得中にエラーが発生しました: {str(e)}")
             
             # 3. ポジション情報の取得（保有銘柄）
-            print(f"\n📈 保有ポジションを取得中...")
+            deco(f"\n📈 保有ポジションを取得中...")
             try:
-                positions_response = api.account.get_account_position(account_id)
+                positions_response = positions_future.result()
+                if isinstance(positions_response, Exception):
+                    raise positions_response
                 
                 if positions_response.status_code == 200:
-                    positions_data = positions_response.json()
+                    positions_data = loads(positions_response.content)
                     
                     # レスポンスがリストの場合とオブジェクトの場合に対応
                     positions = []
@@ -185,127 +247,130 @@ def display_asset_info(app_key: str, app_secret: str):
                             # オブジェクト全体が1つのポジションの場合
                             positions = [positions_data]
                     
-                    # 実際にポジションがあるかチェック（数量が0より大きいもの）
-                    valid_positions = []
-                    for pos in positions:
-                        quantity = pos.get('position', pos.get('quantity', 0))
-                        try:
-                            quantity_float = float(quantity) if quantity else 0
-                            if quantity_float > 0:
-                                valid_positions.append(pos)
-                        except (ValueError, TypeError):
-                            # 数量が取得できない場合もリストに含める
-                            valid_positions.append(pos)
+                    # 1回の走査で、数量が0より大きいものの抽出と表示用の整形を行う
+                    # （件数は走査後に確定するため、銘柄ごとの出力を溜めておく）
+                    blocks = []
+                    # 銘柄数が多い場合は数値変換と損益計算を先にまとめて行う（numpy がある場合のみ）
+                    numbers = None
+                    if len(positions) >= _VECTORIZE_MIN:
+                        numbers = _vectorize_positions(positions)
                     
-                    if valid_positions and len(valid_positions) > 0:
-                        print(f"\n🎯 保有銘柄 ({len(valid_positions)}件):")
-                        print("-" * 40)
+                    for i, pos in enumerate(positions):
+                        # 別名のキーは `or` でつなぎ、最初に値が入っているものを使う
+                        # （0 / '' / None は「値なし」として次のキーを参照する。
+                        #   いずれも数量0・価格なしとして扱われるため表示結果は変わらない）
+                        quantity = pos.get('position') or pos.get('quantity') or 0
+                        if numbers is not None:
+                            quantity_float = numbers[i][0]
+                        else:
+                            try:
+                                quantity_float = _to_float(quantity)
+                            except (ValueError, TypeError):
+                                # 数量が取得できない場合も表示対象に含める
+                                quantity_float = None
+                        if quantity_float is not None and quantity_float <= 0:
+                            continue
                         
-                        for pos in valid_positions:
-                            # ticker情報の取得
-                            ticker_info = pos.get('ticker', {})
-                            symbol = ticker_info.get('symbol', pos.get('symbol', 'N/A'))
-                            
-                            # 数量と価格情報
-                            quantity = pos.get('position', pos.get('quantity', 0))
-                            market_value = pos.get('marketValue', pos.get('market_value', 0))
-                            cost_price = pos.get('costPrice', pos.get('cost_price', pos.get('cost', 0)))
-                            last_price = pos.get('lastPrice', pos.get('last_price', 0))
-                            
-                            # 損益情報
-                            unrealized_pl = pos.get('unrealizedProfitLoss', pos.get('unrealized_profit_loss', None))
-                            unrealized_pl_rate = pos.get('unrealizedProfitLossRate', pos.get('unrealized_profit_loss_rate', None))
-                            
-                            print(f"\nシンボル: {symbol}")
-                            
-                            # 銘柄名があれば表示
-                            if 'name' in ticker_info:
-                                print(f"  銘柄名: {ticker_info['name']}")
+                        # ticker情報の取得
+                        ticker_info = pos.get('ticker') or {}
+                        symbol = ticker_info.get('symbol') or pos.get('symbol') or 'N/A'
+                        
+                        # 価格情報
+                        market_value = pos.get('marketValue') or pos.get('market_value') or 0
+                        cost_price = pos.get('costPrice') or pos.get('cost_price') or pos.get('cost') or 0
+                        last_price = pos.get('lastPrice') or pos.get('last_price') or 0
+                        
+                        # 損益情報（0 も有効な値のため `or` ではなくキーの有無で判定する）
+                        unrealized_pl = pos.get('unrealizedProfitLoss', pos.get('unrealized_profit_loss', None))
+                        unrealized_pl_rate = pos.get('unrealizedProfitLossRate', pos.get('unrealized_profit_loss_rate', None))
+                        
+                        lines = [_POS_FMT['symbol'].format(symbol)]
+                        
+                        # 銘柄名があれば表示
+                        if 'name' in ticker_info:
+                            lines.append(_POS_FMT['name'].format(ticker_info['name']))
+                        
+                        lines.append(_POS_FMT['quantity'].format(quantity))
+                        
+                        # 価格情報
+                        try:
+                            if numbers is not None:
+                                _, cost_price_float, last_price_float, market_value_float, calc_pl, calc_pl_pct = numbers[i]
+                            else:
+                                cost_price_float = _to_float(cost_price)
+                                last_price_float = _to_float(last_price)
+                                market_value_float = _to_float(market_value)
+                                if quantity_float is None:
+                                    # 数量が数値でない場合はここで変換エラーとして扱う
+                                    quantity_float = _to_float(quantity)
                             
-                            print(f"  数量: {quantity}")
+                            if last_price_float > 0:
+                                lines.append(_POS_FMT['last_price'].format(last_price_float))
+                            if cost_price_float > 0:
+                                lines.append(_POS_FMT['cost_price'].format(cost_price_float))
+                            if market_value_float > 0:
+                                lines.append(_POS_FMT['market_value'].format(market_value_float))
                             
-                            # 価格情報
-                            try:
-                                cost_price_float = float(cost_price) if cost_price else 0
-                                last_price_float = float(last_price) if last_price else 0
-                                market_value_float = float(market_value) if market_value else 0
-                                quantity_float = float(quantity) if quantity else 0
-                                
-                                if last_price_float > 0:
-                                    print(f"  現在価格: ${last_price_float:,.2f}")
-                                if cost_price_float > 0:
-                                    print(f"  取得単価: ${cost_price_float:,.2f}")
-                                if market_value_float > 0:
-                                    print(f"  評価額: ${market_value_float:,.2f}")
-                                
-                                # 損益計算
-                                if unrealized_pl is not None and unrealized_pl_rate is not None:
-                                    pl_float = float(unrealized_pl)
-                                    pl_rate_float = float(unrealized_pl_rate) * 100
-                                    print(f"  損益: ${pl_float:,.2f} ({pl_rate_float:+.2f}%)")
-                                elif cost_price_float > 0 and last_price_float > 0 and quantity_float > 0:
+                            # 損益計算
+                            if unrealized_pl is not None and unrealized_pl_rate is not None:
+                                pl_float = float(unrealized_pl)
+                                pl_rate_float = float(unrealized_pl_rate) * 100
+                                lines.append(_POS_FMT['pl'].format(pl_float, pl_rate_float))
+                            elif cost_price_float > 0 and last_price_float > 0 and quantity_float > 0:
+                                if numbers is not None:
+                                    profit_loss, profit_loss_pct = calc_pl, calc_pl_pct
+                                else:
                                     profit_loss = (last_price_float - cost_price_float) * quantity_float
                                     profit_loss_pct = ((last_price_float - cost_price_float) / cost_price_float * 100)
-                                    print(f"  損益: ${profit_loss:,.2f} ({profit_loss_pct:+.2f}%)")
-                            except (ValueError, TypeError) as e:
-                                # 数値変換エラーの場合は生の値を表示
-                                if cost_price:
-                                    print(f"  取得単価: {cost_price}")
-                                if last_price:
-                                    print(f"  現在価格: {last_price}")
-                                if market_value:
-                                    print(f"  評価額: {market_value}")
+                                lines.append(_POS_FMT['pl'].format(profit_loss, profit_loss_pct))
+                        except (ValueError, TypeError) as e:
+                            # 数値変換エラーの場合は生の値を表示
+                            if cost_price:
+                                lines.append(f"  取得単価: {cost_price}")
+                            if last_price:
+                                lines.append(f"  現在価格: {last_price}")
+                            if market_value:
+                                lines.append(f"  評価額: {market_value}")
+                        
+                        blocks.append('\n'.join(lines))
+                    
+                    if blocks:
+                        pln(f"\n🎯 保有銘柄 ({len(blocks)}件):")
+                        pln(HR_DASH)
+                        buf.write('\n'.join(blocks) + '\n')
                     else:
-                        print("📭 保有ポジションはありません")
+                        pln("📭 保有ポジションはありません")
                 else:
-                    print(f"⚠️  ポジション情報の取得に失敗しました (ステータスコード: {positions_response.status_code})")
+                    pln(f"⚠️  ポジション情報の取得に失敗しました (ステータスコード: {positions_response.status_code})")
             
             except Exception as e:
-                print(f"⚠️  ポジション取得中にエラーが発生しました: {str(e)}")
+                pln(f"⚠️  ポジション取得中にエラーが発生しました: {str(e)}")
         
-        print(f"\n{'=' * 60}")
-        print("✅ 資産情報の取得が完了しました")
-        print(f"{'=' * 60}\n")
+        deco(f"\n{HR_EQ}")
+        pln("✅ 資産情報の取得が完了しました")
+        deco(f"{HR_EQ}\n")
     
     except Exception as e:
-        print(f"\n❌ エラーが発生しました: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        pln(f"\n❌ エラーが発生しました: {str(e)}")
+        logger.exception("資産情報の取得に失敗しました")
+    
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
 
 
 def main():
     """メイン関数"""
     
-    # .envファイルから環境変数を読み込む
-    load_env_file()
-    
-    # 環境変数から取得
-    app_key = os.getenv('WEBULL_APP_KEY')
-    app_secret = os.getenv('WEBULL_APP_SECRET')
+    args = parse_args()
     
-    # APIキーの確認
-    if not app_key or not app_secret:
-        print("❌ エラー: APIキーとシークレットが設定されていません\n")
-        print("設定方法:")
-        print("\n1. .envファイルを使用（推奨）:")
-        print("   スクリプトと同じディレクトリに.envファイルを作成し、以下の内容を記載:")
-        print("   ---")
-        print("   WEBULL_APP_KEY=your_actual_key")
-        print("   WEBULL_APP_SECRET=your_actual_secret")
-        print("   ---")
-        print("\n2. 環境変数を使用:")
-        print("   export WEBULL_APP_KEY='your_actual_key'")
-        print("   export WEBULL_APP_SECRET='your_actual_secret'")
-        print("\nAPIキーの取得方法:")
-        print("https://www.webull.co.jp/center でOpenAPIを申請してください")
+    # .envファイルと環境変数からAPIキーを取得
+    app_key, app_secret = parse_credentials()
+    if not app_key:
         return
     
-    print(f"🔑 APIキーを確認しました")
-    print(f"   App Key: {app_key[:8]}...{app_key[-4:] if len(app_key) > 12 else ''}")
-    print()
-    
     # 資産情報の表示
-    display_asset_info(app_key, app_secret)
+    display_asset_info(app_key, app_secret, use_cache=not args.refresh)
 
 
 if __name__ == '__main__':
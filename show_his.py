@@ -19,27 +19,87 @@ Webull Japan OpenAPI - 当日取引履歴取得スクリプト
 使用方法:
 1. .envファイルにWebull APIの認証情報を設定
 2. python get_order_history.py を実行
+   (--summary-only: 統計情報のみ出力 / --format json: 注文をJSONで標準出力に出力)
 """
 
+import io
 import os
+import re
 import sys
+import shutil
+import argparse
 import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
 
-# Webull SDK のインポート
+# Webull SDK のインポート(APIクライアントは webull_client で共有する)
 try:
-    from webullsdkcore.client import ApiClient
-    from webullsdktrade.api import API
-    from webullsdkcore.common.region import Region
+    from webull_client import get_api, get_subscriptions
 except ImportError as e:
     print("エラー: 必要なパッケージがインストールされていません。")
     print("以下のコマンドでインストールしてください:")
     print("pip install webull-python-sdk-core webull-python-sdk-trade python-dotenv")
     sys.exit(1)
 
+from show_asset_common import loads
+
+
+# 注文ステータス・売買区分・注文タイプの日本語表記
+# 呼び出しごとに辞書を作らないようモジュール読み込み時に1回だけ作成する(読み取り専用)
+_STATUS_MAP = MappingProxyType({
+    'Working': '処理中',
+    'Filled': '約定',
+    'Cancelled': 'キャンセル',
+    'Rejected': '拒否',
+    'PendingCancel': 'キャンセル待ち',
+    'PartialFilled': '一部約定',
+    'Failed': '失敗'
+})
+
+_SIDE_MAP = MappingProxyType({
+    'BUY': '買',
+    'SELL': '売'
+})
+
+_TYPE_MAP = MappingProxyType({
+    'LIMIT': '指値',
+    'MARKET': '成行',
+    'STOP': '逆指値',
+    'STOP_LIMIT': '逆指値(指値)'
+})
+
+
+# list_today_orders の1ページあたりの最大取得件数(SDKの仕様上の上限)
+MAX_PAGE_SIZE = 100
+
+
+def _format_jpy(amount):
+    """日本円の金額を整数(カンマ区切り)に整形する"""
+    return f"{int(amount):,}"
+
+
+def _format_default_currency(amount):
+    """日本円以外の金額を小数点以下2桁(カンマ区切り)に整形する"""
+    return f"{amount:,.2f}"
+
+
+# 通貨ごとの金額フォーマット関数の対応表(日本円は整数、その他の通貨は小数点2桁)
+_CURRENCY_FORMATTERS = MappingProxyType({
+    'JPY': _format_jpy,
+})
+
+# 注文日時の表示形式
+_DATETIME_FMT = '%Y-%m-%d %H:%M:%S'
+
+# UTCのISO 8601形式(末尾Z、小数秒は任意)の日付・時刻部分を取り出す正規表現
+_ISO_UTC_RE = re.compile(r'(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2}:\d{2})(?:\.\d+)?Z')
+
 
 class MarkdownLogger:
     """
@@ -48,13 +108,17 @@ class MarkdownLogger:
     API認証情報を出力から除外し、セキュアな出力を実現します。
     """
     
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, console=None):
         """
         Args:
             filename: 出力するMarkdownファイルのパス
+            console: コンソール出力先(省略時は標準出力)
         """
         self.filename = filename
-        self.lines: List[str] = []
+        self._console = console or sys.stdout
+        # ファイルに出力する内容(行は改行で区切って書き込む)
+        self._buf = io.StringIO()
+        self._has_lines = False
         
     def print(self, message: str = "", to_file: bool = True, to_console: bool = True):
         """
@@ -66,15 +130,21 @@ class MarkdownLogger:
             to_console: コンソールに出力するか
         """
         if to_console:
-            print(message)
+            self._console.write(message + '\n')
         if to_file:
-            self.lines.append(message)
+            # 2行目以降は直前に改行を入れる(ファイル末尾に余分な改行を付けない)
+            if self._has_lines:
+                self._buf.write('\n')
+            self._buf.write(message)
+            self._has_lines = True
     
     def save(self):
         """Markdownファイルに保存"""
         try:
             with open(self.filename, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(self.lines))
+                # 出力内容全体の文字列コピーを作らず、バッファから64KiBずつ書き込む
+                self._buf.seek(0)
+                shutil.copyfileobj(self._buf, f, 1 << 16)
             print(f"\n✓ 結果を {self.filename} に保存しました")
         except Exception as e:
             print(f"\n✗ ファイル保存エラー: {e}")
@@ -93,7 +163,6 @@ class WebullOrderHistory:
         """
         self.app_key = app_key
         self.app_secret = app_secret
-        self.api_client = None
         self.api = None
         self.account_id = None
         
@@ -106,12 +175,8 @@ class WebullOrderHistory:
         """
         try:
             # APIクライアントの初期化(日本リージョン)
-            self.api_client = ApiClient(
-                self.app_key,
-                self.app_secret,
-                Region.JP.value
-            )
-            self.api = API(self.api_client)
+            # 同じプロセス内の他のレポートとクライアント・HTTP接続を共有する
+            self.api = get_api(self.app_key, self.app_secret)
             return True
         except Exception as e:
             print(f"✗ API初期化エラー: {e}")
@@ -121,18 +186,19 @@ class WebullOrderHistory:
         """
         アカウントIDを取得
         
+        口座一覧はディスクにキャッシュし(show_asset と共通)、有効期間内であれば
+        APIを呼ばずに注文履歴の取得へ進む(同じプロセス内では取得結果を再利用する)
+        
         Returns:
             アカウントID、取得失敗時はNone
         """
         try:
-            response = self.api.account.get_app_subscriptions()
+            accounts, response = get_subscriptions(self.api, self.app_key)
             
-            if response.status_code != 200:
+            if accounts is None:
                 print(f"✗ アカウント情報取得エラー: ステータスコード {response.status_code}")
                 return None
             
-            accounts = response.json()
-            
             if not accounts or len(accounts) == 0:
                 print("✗ アカウントが見つかりません")
                 return None
@@ -145,12 +211,12 @@ class WebullOrderHistory:
             print(f"✗ アカウントID取得エラー: {e}")
             return None
     
-    def get_today_orders(self, page_size: int = 100) -> Optional[List[Dict[str, Any]]]:
+    def get_today_orders(self, page_size: int = MAX_PAGE_SIZE) -> Optional[List[Dict[str, Any]]]:
         """
         当日の注文履歴を取得
         
         Args:
-            page_size: 1回のリクエストで取得する注文数(最大100)
+            page_size: 1回のリクエストで取得する注文数(最大100、超える値は100として扱う)
             
         Returns:
             注文リスト、取得失敗時はNone
@@ -159,36 +225,48 @@ class WebullOrderHistory:
             print("✗ アカウントIDが設定されていません")
             return None
         
+        # リクエスト回数を最小にするため、上限を超える指定は上限に丸める
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        
         try:
             all_orders = []
-            last_client_order_id = None
             
             # ページネーションで全ての注文を取得
-            while True:
-                response = self.api.order.list_today_orders(
+            # 次のページは前のページの最後の注文IDが分かった時点で先行して要求し、
+            # その通信中に取得済みのページを処理する
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(
+                    self.api.order.list_today_orders,
                     self.account_id,
                     page_size,
-                    last_client_order_id
+                    None
                 )
                 
-                if response.status_code != 200:
-                    print(f"✗ 注文履歴取得エラー: ステータスコード {response.status_code}")
-                    return None
-                
-                data = response.json()
-                orders = data.get('data', [])
-                
-                if not orders:
-                    break
-                
-                all_orders.extend(orders)
-                
-                # 次のページがあるかチェック
-                if len(orders) < page_size:
-                    break
-                
-                # 次のページのために最後の注文IDを保存
-                last_client_order_id = orders[-1].get('client_order_id')
+                while future is not None:
+                    response = future.result()
+                    
+                    if response.status_code != 200:
+                        print(f"✗ 注文履歴取得エラー: ステータスコード {response.status_code}")
+                        return None
+                    
+                    # 本文のバイト列を直接デコードする(文字列への変換コピーを作らない)
+                    data = loads(response.content)
+                    orders = data.get('data', [])
+                    
+                    if not orders:
+                        break
+                    
+                    # 次のページがあれば、最後の注文IDを使って先に要求しておく
+                    future = None
+                    if len(orders) >= page_size:
+                        future = executor.submit(
+                            self.api.order.list_today_orders,
+                            self.account_id,
+                            page_size,
+                            orders[-1].get('client_order_id')
+                        )
+                    
+                    all_orders.extend(orders)
             
             return all_orders
             
@@ -206,16 +284,7 @@ class WebullOrderHistory:
         Returns:
             日本語の注文ステータス
         """
-        status_map = {
-            'Working': '処理中',
-            'Filled': '約定',
-            'Cancelled': 'キャンセル',
-            'Rejected': '拒否',
-            'PendingCancel': 'キャンセル待ち',
-            'PartialFilled': '一部約定',
-            'Failed': '失敗'
-        }
-        return status_map.get(status, status)
+        return _STATUS_MAP.get(status, status)
     
     def format_order_side(self, side: str) -> str:
         """
@@ -227,11 +296,7 @@ class WebullOrderHistory:
         Returns:
             日本語の売買区分
         """
-        side_map = {
-            'BUY': '買',
-            'SELL': '売'
-        }
-        return side_map.get(side, side)
+        return _SIDE_MAP.get(side, side)
     
     def format_order_type(self, order_type: str) -> str:
         """
@@ -243,13 +308,7 @@ class WebullOrderHistory:
         Returns:
             日本語の注文タイプ
         """
-        type_map = {
-            'LIMIT': '指値',
-            'MARKET': '成行',
-            'STOP': '逆指値',
-            'STOP_LIMIT': '逆指値(指値)'
-        }
-        return type_map.get(order_type, order_type)
+        return _TYPE_MAP.get(order_type, order_type)
 
 
 def format_currency_amount(amount: float, currency: str) -> str:
@@ -263,17 +322,49 @@ def format_currency_amount(amount: float, currency: str) -> str:
     Returns:
         フォーマットされた金額文字列
     """
-    if currency == 'JPY':
-        # 日本円は整数で表示
-        return f"{int(amount):,}"
-    else:
-        # その他の通貨は小数点2桁
-        return f"{amount:,.2f}"
+    return _CURRENCY_FORMATTERS.get(currency, _format_default_currency)(amount)
+
+
+def _page_size(value):
+    """--page-size の値を1以上の整数に変換する(argparse の type として使用)"""
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value}")
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"1以上の値を指定してください: {value}")
+    return size
+
+
+def parse_args():
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="Webull Japan - 当日取引履歴")
+    parser.add_argument(
+        '--summary-only',
+        action='store_true',
+        help='注文ごとの詳細を出力せず、サマリーと統計情報のみを出力する'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=_page_size,
+        default=MAX_PAGE_SIZE,
+        help=f'1回のリクエストで取得する注文数(1〜{MAX_PAGE_SIZE}、上限を超える値は{MAX_PAGE_SIZE}として扱う)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=('markdown', 'json'),
+        default='markdown',
+        help='json を指定すると取得した注文をJSONで標準出力に書き出す(Markdownファイルは作成しない)'
+    )
+    return parser.parse_args()
 
 
 def main():
     """メイン処理"""
     
+    args = parse_args()
+    json_output = args.format == 'json'
+    
     # スクリプトのパスを取得
     script_path = Path(__file__).resolve()
     script_dir = script_path.parent
@@ -283,7 +374,8 @@ def main():
     md_filename = script_dir / f"{script_name}.md"
     
     # MarkdownLoggerの初期化
-    logger = MarkdownLogger(str(md_filename))
+    # JSON出力時は標準出力をJSONのみにするため、進捗メッセージは標準エラー出力に出す
+    logger = MarkdownLogger(str(md_filename), console=sys.stderr if json_output else None)
     
     # ヘッダー出力
     logger.print("# Webull Japan OpenAPI - 当日取引履歴")
@@ -353,7 +445,7 @@ def main():
     
     # 当日の注文履歴を取得
     logger.print("📊 当日の注文履歴を取得中...", to_file=False)
-    orders = webull.get_today_orders()
+    orders = webull.get_today_orders(page_size=args.page_size)
     
     if orders is None:
         logger.print()
@@ -366,6 +458,11 @@ def main():
     logger.print(f"✓ {len(orders)}件の注文を取得しました", to_file=False)
     logger.print()
     
+    # JSON出力(後続処理向け)の場合は取得した注文をそのまま書き出して終了
+    if json_output:
+        sys.stdout.write(json.dumps(orders, ensure_ascii=False, separators=(',', ':')) + '\n')
+        return
+    
     # 結果の出力
     logger.print("## 取引履歴サマリー")
     logger.print()
@@ -379,94 +476,119 @@ def main():
         logger.print("当日の注文履歴はありません。")
         logger.print()
     else:
-        logger.print("## 注文一覧")
-        logger.print()
-        
-        # 注文を時刻順にソート(新しい順)
-        orders_sorted = sorted(
-            orders,
-            key=lambda x: x.get('create_time', ''),
-            reverse=True
-        )
-        
-        for idx, order in enumerate(orders_sorted, 1):
-            logger.print(f"### 注文 #{idx}")
+        if args.summary_only:
+            # 注文ごとの詳細は出力せず、ステータス別・売買別の件数のみ集計する
+            statuses = (order.get('status', 'N/A') for order in orders)
+            status_counts = Counter(_STATUS_MAP.get(status, status) for status in statuses)
+            sides = (order.get('side', 'N/A') for order in orders)
+            side_counts = Counter(_SIDE_MAP.get(side, side) for side in sides)
+        else:
+            logger.print("## 注文一覧")
             logger.print()
             
-            # 基本情報
-            symbol = order.get('symbol', 'N/A')
-            instrument_name = order.get('instrument_name', 'N/A')
-            side = webull.format_order_side(order.get('side', 'N/A'))
-            order_type = webull.format_order_type(order.get('order_type', 'N/A'))
-            status = webull.format_order_status(order.get('status', 'N/A'))
-            
-            logger.print(f"- **銘柄**: {symbol} ({instrument_name})")
-            logger.print(f"- **売買**: {side}")
-            logger.print(f"- **注文種別**: {order_type}")
-            logger.print(f"- **ステータス**: {status}")
-            
-            # 数量と価格
-            quantity = order.get('qty', 0)
-            filled_qty = order.get('filled_qty', 0)
-            limit_price = order.get('limit_price', 0)
-            avg_filled_price = order.get('avg_filled_price', 0)
-            currency = order.get('currency', 'USD')
+            # 注文を時刻順にソート(新しい順)
+            # create_time のない注文は空文字として補い、キーの取得を itemgetter(C実装)で行う
+            # 新しいリストは作らずにその場で並べ替える
+            for order in orders:
+                order.setdefault('create_time', '')
+            orders.sort(key=itemgetter('create_time'), reverse=True)
             
-            logger.print(f"- **注文数量**: {quantity}")
+            # ステータス別・売買別の件数は、注文一覧の出力と同じループで集計する
+            status_counts = Counter()
+            side_counts = Counter()
             
-            if filled_qty > 0:
-                logger.print(f"- **約定数量**: {filled_qty}")
+            # ループ内で繰り返し参照するメソッドはローカル変数に束縛しておく
+            # (注文ごとの属性検索を省く。日本語表記は format_order_* と同じ変換表を直接参照する)
+            log = logger.print
+            side_get = _SIDE_MAP.get
+            type_get = _TYPE_MAP.get
+            status_get = _STATUS_MAP.get
+            currency_fmt_get = _CURRENCY_FORMATTERS.get
             
-            if order_type == '指値' and limit_price > 0:
-                logger.print(f"- **指値価格**: {currency} {format_currency_amount(limit_price, currency)}")
-            
-            if avg_filled_price > 0:
-                logger.print(f"- **平均約定価格**: {currency} {format_currency_amount(avg_filled_price, currency)}")
-            
-            # 時刻情報
-            create_time = order.get('create_time', '')
-            if create_time:
-                try:
-                    dt = datetime.fromisoformat(create_time.replace('Z', '+00:00'))
-                    logger.print(f"- **注文日時**: {dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                except:
-                    logger.print(f"- **注文日時**: {create_time}")
-            
-            # 注文ID(参照用)
-            client_order_id = order.get('client_order_id', 'N/A')
-            logger.print(f"- **注文ID**: `{client_order_id}`")
+            for idx, order in enumerate(orders, 1):
+                get = order.get
+                log(f"### 注文 #{idx}")
+                log()
+                
+                # 基本情報(売買区分・注文種別・ステータスは日本語表記に変換)
+                symbol = get('symbol', 'N/A')
+                instrument_name = get('instrument_name', 'N/A')
+                side = get('side', 'N/A')
+                side = side_get(side, side)
+                order_type = get('order_type', 'N/A')
+                order_type = type_get(order_type, order_type)
+                status = get('status', 'N/A')
+                status = status_get(status, status)
+                status_counts[status] += 1
+                side_counts[side] += 1
+                
+                log(f"- **銘柄**: {symbol} ({instrument_name})")
+                log(f"- **売買**: {side}")
+                log(f"- **注文種別**: {order_type}")
+                log(f"- **ステータス**: {status}")
+                
+                # 数量と価格
+                quantity = get('qty', 0)
+                filled_qty = get('filled_qty', 0)
+                limit_price = get('limit_price', 0)
+                avg_filled_price = get('avg_filled_price', 0)
+                currency = get('currency', 'USD')
+                
+                log(f"- **注文数量**: {quantity}")
+                
+                if filled_qty > 0:
+                    log(f"- **約定数量**: {filled_qty}")
+                
+                # 金額のフォーマット関数は注文ごとに1回だけ選ぶ
+                fmt_amount = currency_fmt_get(currency, _format_default_currency)
+                
+                if order_type == '指値' and limit_price > 0:
+                    log(f"- **指値価格**: {currency} {fmt_amount(limit_price)}")
+                
+                if avg_filled_price > 0:
+                    log(f"- **平均約定価格**: {currency} {fmt_amount(avg_filled_price)}")
+                
+                # 時刻情報
+                create_time = get('create_time', '')
+                if create_time:
+                    # 通常の形式(2024-01-01T09:30:00Z など)は datetime に変換せず文字列から取り出す
+                    m = _ISO_UTC_RE.fullmatch(create_time) if isinstance(create_time, str) else None
+                    if m:
+                        log(f"- **注文日時**: {m[1]} {m[2]}")
+                    else:
+                        try:
+                            dt = datetime.fromisoformat(create_time.replace('Z', '+00:00'))
+                            log(f"- **注文日時**: {dt.strftime(_DATETIME_FMT)}")
+                        except (ValueError, AttributeError):
+                            # 日時として解釈できない値(文字列以外を含む)はそのまま表示する
+                            log(f"- **注文日時**: {create_time}")
+                
+                # 注文ID(参照用)
+                client_order_id = get('client_order_id', 'N/A')
+                log(f"- **注文ID**: `{client_order_id}`")
+                
+                log()
             
-            logger.print()
-        
         # 統計情報
         logger.print("---")
         logger.print()
         logger.print("## 統計情報")
         logger.print()
         
-        # ステータス別集計
-        status_counts = {}
-        for order in orders:
-            status = webull.format_order_status(order.get('status', 'N/A'))
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
+        # ステータス別集計(件数の多い順)
         logger.print("### ステータス別件数")
         logger.print()
-        for status, count in sorted(status_counts.items()):
+        for status, count in status_counts.most_common():
             logger.print(f"- **{status}**: {count}件")
         logger.print()
         
-        # 売買別集計
-        side_counts = {'買': 0, '売': 0}
-        for order in orders:
-            side = webull.format_order_side(order.get('side', ''))
-            if side in side_counts:
-                side_counts[side] += 1
-        
+        # 売買別集計(買・売は0件でも表示し、それ以外の区分も件数の多い順に表示する)
         logger.print("### 売買別件数")
         logger.print()
-        logger.print(f"- **買注文**: {side_counts['買']}件")
-        logger.print(f"- **売注文**: {side_counts['売']}件")
+        logger.print(f"- **買注文**: {side_counts.pop('買', 0)}件")
+        logger.print(f"- **売注文**: {side_counts.pop('売', 0)}件")
+        for side, count in side_counts.most_common():
+            logger.print(f"- **{side}**: {count}件")
         logger.print()
     
     logger.print("---")
@@ -7,12 +7,32 @@ Webull Japan OpenAPI - ポジション表示スクリプト
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from dotenv import load_dotenv
-from webullsdktrade.api import API
-from webullsdkcore.client import ApiClient
-from webullsdkcore.common.region import Region
+from show_asset_common import loads
+from webull_client import get_api, get_subscriptions
+
+
+# get_account_position の1ページあたりの最大取得件数(SDKの仕様上の上限)
+MAX_PAGE_SIZE = 100
+
+
+def _format_jpy(value):
+    """日本円の金額を整数(カンマ区切り)に整形する"""
+    return f"{int(value):,}"
+
+
+def _format_default_currency(value):
+    """日本円以外の金額を小数点以下2桁(カンマ区切り)に整形する"""
+    return f"{value:,.2f}"
+
+
+# 通貨ごとの金額フォーマット関数の対応表(JPYは整数、その他の通貨は小数点以下2桁)
+_CURRENCY_FORMATTERS = {
+    'JPY': _format_jpy,
+}
 
 
 class MarkdownLogger:
@@ -21,166 +41,184 @@ class MarkdownLogger:
     def __init__(self, filename):
         self.filename = filename
         self.terminal = sys.stdout
-        # ファイルを初期化(既存の内容をクリア)
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write('')
+        # ファイルを開いたままにする(既存の内容はクリア)
+        # 書き込みのたびに開き直さず、close() で閉じる
+        self._f = open(filename, 'w', encoding='utf-8', buffering=1 << 16)
     
-    def write(self, message):
-        """標準出力とファイルの両方に書き込む"""
-        self.terminal.write(message)
-        with open(self.filename, 'a', encoding='utf-8') as f:
-            f.write(message)
+    def write_line(self, message=""):
+        """1行を標準出力とファイルの両方に書き込む"""
+        line = message + "\n"
+        self.terminal.write(line)
+        self._f.write(line)
     
-    def flush(self):
-        """バッファをフラッシュ"""
-        self.terminal.flush()
+    def close(self):
+        """ファイルを閉じる"""
+        if not self._f.closed:
+            self._f.close()
 
 
 def format_currency(value, currency="JPY"):
     """
     通貨フォーマット関数
     JPYの場合は整数表示、それ以外は小数点以下2桁まで表示
+    表示専用のため Decimal は使わず float で変換する(0E-10 などの科学的記数法も変換可能)
     """
     try:
-        # Decimal型に変換
-        if isinstance(value, str):
-            # 科学的記数法(0E-10など)をチェック
-            if 'E' in value.upper():
-                decimal_value = Decimal(value)
-                if decimal_value == 0:
-                    value = "0"
-                else:
-                    value = str(decimal_value)
-            decimal_value = Decimal(value)
-        else:
-            decimal_value = Decimal(str(value))
+        float_value = float(value)
         
-        # JPYの場合は整数表示
-        if currency == "JPY":
-            return f"{int(decimal_value):,}"
-        else:
-            # その他の通貨は小数点以下2桁
-            return f"{float(decimal_value):,.2f}"
-    except Exception as e:
+        # 科学的記数法のゼロ(-0E-10など)は符号を付けずに0として扱う
+        if float_value == 0 and isinstance(value, str) and 'E' in value.upper():
+            float_value = 0.0
+        
+        # JPYの場合は整数表示、その他の通貨は小数点以下2桁
+        return _CURRENCY_FORMATTERS.get(currency, _format_default_currency)(float_value)
+    except (ValueError, TypeError, OverflowError):
+        # 数値に変換できない値(NaN・無限大を含む)はそのまま表示する
         return str(value)
 
 
-def get_account_id(api):
+def format_quantity(qty):
+    """
+    数量フォーマット関数
+    小数点以下4桁まで表示し、末尾の0と小数点は省略する
+    数値に変換できない場合はそのまま返す
+    """
+    try:
+        return f"{float(qty):,.4f}".rstrip('0').rstrip('.')
+    except (ValueError, TypeError):
+        return qty
+
+
+def get_account_id(api, app_key, log=print):
     """
     アカウントIDを取得
     
+    口座一覧はディスクにキャッシュし(show_asset と共通)、有効期間内であれば
+    APIを呼ばずにポジション情報の取得へ進む(同じプロセス内では取得結果を再利用する)
+    
+    Args:
+        api: Webull API instance
+        app_key: キャッシュのキーに使用するAPIキー
+        log: 1行を出力する関数
+    
     Returns:
         str: アカウントID
     """
     try:
-        response = api.account.get_app_subscriptions()
+        result, response = get_subscriptions(api, app_key)
         
-        if response.status_code == 200:
-            result = response.json()
+        if result is not None:
             if result and len(result) > 0:
                 account_id = result[0].get('account_id')
                 return account_id
             else:
-                print("エラー: アカウント情報が取得できませんでした")
+                log("エラー: アカウント情報が取得できませんでした")
                 return None
         else:
-            print(f"エラー: APIリクエストが失敗しました (ステータスコード: {response.status_code})")
+            log(f"エラー: APIリクエストが失敗しました (ステータスコード: {response.status_code})")
             if hasattr(response, 'text'):
-                print(f"レスポンス: {response.text}")
+                log(f"レスポンス: {response.text}")
             return None
             
     except Exception as e:
-        print(f"エラー: アカウントIDの取得中に例外が発生しました - {str(e)}")
+        log(f"エラー: アカウントIDの取得中に例外が発生しました - {str(e)}")
         return None
 
 
-def get_positions(api, account_id):
+def get_positions(api, account_id, page_size=MAX_PAGE_SIZE, log=print):
     """
     ポジション情報を取得
     
     Args:
         api: Webull API instance
         account_id: アカウントID
+        page_size: 1回のリクエストで取得する件数(最大100、超える値は100として扱う)
+        log: 1行を出力する関数
         
     Returns:
         list: ポジション情報のリスト
     """
     try:
         all_positions = []
-        last_instrument_id = None
-        page_size = 100  # 最大ページサイズ
+        # リクエスト回数を最小にするため、上限を超える指定は上限に丸める
+        page_size = min(page_size, MAX_PAGE_SIZE)
         
-        while True:
-            # ページネーションを使用してポジション情報を取得
-            if last_instrument_id:
-                response = api.account.get_account_position(
-                    account_id=account_id,
-                    page_size=page_size,
-                    last_instrument_id=last_instrument_id
-                )
-            else:
-                response = api.account.get_account_position(
-                    account_id=account_id,
-                    page_size=page_size
-                )
+        # ページネーションを使用してポジション情報を取得
+        # 次のページは前のページの最後のinstrument_idが分かった時点で先行して要求し、
+        # その通信中に取得済みのページの絞り込みを行う
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                api.account.get_account_position,
+                account_id=account_id,
+                page_size=page_size
+            )
             
-            if response.status_code == 200:
-                data = response.json()
-                holdings = data.get('holdings', [])
-                
-                # 数量が0でないポジションのみを追加
-                for holding in holdings:
-                    qty = holding.get('qty', '0')
-                    try:
-                        qty_decimal = Decimal(qty)
-                        if qty_decimal > 0:
-                            all_positions.append(holding)
-                    except:
-                        # 変換できない場合はスキップ
-                        continue
+            while future is not None:
+                response = future.result()
+                future = None
                 
-                # 次のページがあるかチェック
-                has_next = data.get('has_next', False)
-                if has_next and holdings:
-                    # 最後のinstrument_idを取得
-                    last_instrument_id = holdings[-1].get('instrument_id')
+                if response.status_code == 200:
+                    # 本文のバイト列を直接デコードする(文字列への変換コピーを作らない)
+                    data = loads(response.content)
+                    holdings = data.get('holdings', [])
+                    
+                    # 次のページがあるかチェック
+                    has_next = data.get('has_next', False)
+                    if has_next and holdings:
+                        # 最後のinstrument_idで次のページを先に要求しておく
+                        params = {'account_id': account_id, 'page_size': page_size}
+                        last_instrument_id = holdings[-1].get('instrument_id')
+                        if last_instrument_id:
+                            params['last_instrument_id'] = last_instrument_id
+                        future = executor.submit(api.account.get_account_position, **params)
+                    
+                    # 数量が0でないポジションのみを追加
+                    for holding in holdings:
+                        qty = holding.get('qty', '0')
+                        try:
+                            qty_decimal = Decimal(qty)
+                            if qty_decimal > 0:
+                                all_positions.append(holding)
+                        except (InvalidOperation, ValueError, TypeError):
+                            # 変換できない場合はスキップ
+                            continue
                 else:
-                    # 次のページがない、または保有がない場合は終了
-                    break
-            else:
-                print(f"エラー: ポジション情報の取得に失敗しました (ステータスコード: {response.status_code})")
-                if hasattr(response, 'text'):
-                    print(f"レスポンス: {response.text}")
-                break
+                    log(f"エラー: ポジション情報の取得に失敗しました (ステータスコード: {response.status_code})")
+                    if hasattr(response, 'text'):
+                        log(f"レスポンス: {response.text}")
         
         return all_positions
         
     except Exception as e:
-        print(f"エラー: ポジション情報の取得中に例外が発生しました - {str(e)}")
+        log(f"エラー: ポジション情報の取得中に例外が発生しました - {str(e)}")
         return []
 
 
-def display_positions(positions):
+def display_positions(positions, log=print):
     """
     ポジション情報を整形して表示
     
     Args:
         positions: ポジション情報のリスト
+        log: 1行を出力する関数
     """
     if not positions:
-        print("\n現在保有しているポジションはありません。")
+        log("\n現在保有しているポジションはありません。")
         return
     
-    print("\n" + "=" * 100)
-    print("現在のポジション一覧")
-    print("=" * 100)
+    log("\n" + "=" * 100)
+    log("現在のポジション一覧")
+    log("=" * 100)
     
     # テーブルヘッダー
-    print(f"\n{'No.':<4} {'Symbol':<8} {'銘柄名':<30} {'数量':<10} {'平均取得価格':<15} {'現在価格':<15}")
-    print("-" * 100)
+    log(f"\n{'No.':<4} {'Symbol':<8} {'銘柄名':<30} {'数量':<10} {'平均取得価格':<15} {'現在価格':<15}")
+    log("-" * 100)
     
     total_positions = len(positions)
     
+    # 整形した数量は詳細情報の表示でも使うため保持しておく
+    qty_strs = []
+    
     for idx, position in enumerate(positions, 1):
         symbol = position.get('symbol', 'N/A')
         instrument_name = position.get('instrument_name', 'N/A')
@@ -190,11 +228,8 @@ def display_positions(positions):
         currency = position.get('currency', 'USD')
         
         # 数量のフォーマット
-        try:
-            qty_decimal = Decimal(qty)
-            qty_str = f"{float(qty_decimal):,.4f}".rstrip('0').rstrip('.')
-        except:
-            qty_str = qty
+        qty_str = format_quantity(qty)
+        qty_strs.append(qty_str)
         
         # 価格のフォーマット
         avg_price_str = format_currency(avg_price, currency)
@@ -204,70 +239,84 @@ def display_positions(positions):
         if len(instrument_name) > 28:
             instrument_name = instrument_name[:27] + "..."
         
-        print(f"{idx:<4} {symbol:<8} {instrument_name:<30} {qty_str:<10} {avg_price_str:<15} {last_price_str:<15}")
+        log(f"{idx:<4} {symbol:<8} {instrument_name:<30} {qty_str:<10} {avg_price_str:<15} {last_price_str:<15}")
     
-    print("-" * 100)
-    print(f"\n合計ポジション数: {total_positions}")
-    print("=" * 100 + "\n")
+    log("-" * 100)
+    log(f"\n合計ポジション数: {total_positions}")
+    log("=" * 100 + "\n")
     
     # 詳細情報の表示
-    print("\n詳細情報:")
-    print("=" * 100)
+    log("\n詳細情報:")
+    log("=" * 100)
+    
+    # 通貨別の評価額・評価損益の合計(詳細情報の計算と同じループで集計する)
+    totals = {}
     
     for idx, position in enumerate(positions, 1):
-        print(f"\n--- ポジション {idx} ---")
-        print(f"Symbol: {position.get('symbol', 'N/A')}")
-        print(f"銘柄名: {position.get('instrument_name', 'N/A')}")
-        print(f"Instrument ID: {position.get('instrument_id', 'N/A')}")
-        print(f"Instrument Type: {position.get('instrument_type', 'N/A')}")
+        log(f"\n--- ポジション {idx} ---")
+        log(f"Symbol: {position.get('symbol', 'N/A')}")
+        log(f"銘柄名: {position.get('instrument_name', 'N/A')}")
+        log(f"Instrument ID: {position.get('instrument_id', 'N/A')}")
+        log(f"Instrument Type: {position.get('instrument_type', 'N/A')}")
         
         currency = position.get('currency', 'USD')
         qty = position.get('qty', '0')
         cost_price = position.get('cost_price', '0')
         last_price = position.get('last_price', '0')
         
-        # 数量
-        try:
-            qty_decimal = Decimal(qty)
-            print(f"保有数量: {float(qty_decimal):,.4f}".rstrip('0').rstrip('.'))
-        except:
-            print(f"保有数量: {qty}")
+        # 数量(一覧表示で整形済みの値を使用)
+        log(f"保有数量: {qty_strs[idx - 1]}")
         
         # 平均取得価格
-        print(f"平均取得価格: {format_currency(cost_price, currency)} {currency}")
+        log(f"平均取得価格: {format_currency(cost_price, currency)} {currency}")
         
         # 現在価格
-        print(f"現在価格: {format_currency(last_price, currency)} {currency}")
+        log(f"現在価格: {format_currency(last_price, currency)} {currency}")
         
-        # 評価額の計算
+        # 評価額の計算(計算結果の精度が必要なため Decimal を使用し、各値は1回だけ変換する)
         try:
             qty_decimal = Decimal(qty)
             last_price_decimal = Decimal(last_price)
             market_value = qty_decimal * last_price_decimal
-            print(f"評価額: {format_currency(str(market_value), currency)} {currency}")
+            log(f"評価額: {format_currency(str(market_value), currency)} {currency}")
+            total = totals.setdefault(currency, [Decimal(0), Decimal(0)])
+            total[0] += market_value
             
             # 損益の計算
+            # (価格差は損益額と損益率で共通のため1回だけ計算する)
             cost_price_decimal = Decimal(cost_price)
-            profit_loss = (last_price_decimal - cost_price_decimal) * qty_decimal
-            profit_loss_pct = ((last_price_decimal - cost_price_decimal) / cost_price_decimal * 100) if cost_price_decimal != 0 else 0
+            price_diff = last_price_decimal - cost_price_decimal
+            profit_loss = price_diff * qty_decimal
+            profit_loss_pct = (price_diff / cost_price_decimal * 100) if cost_price_decimal != 0 else 0
+            total[1] += profit_loss
             
             profit_loss_str = format_currency(str(profit_loss), currency)
             if profit_loss >= 0:
-                print(f"評価損益: +{profit_loss_str} {currency} (+{float(profit_loss_pct):.2f}%)")
+                log(f"評価損益: +{profit_loss_str} {currency} (+{float(profit_loss_pct):.2f}%)")
             else:
-                print(f"評価損益: {profit_loss_str} {currency} ({float(profit_loss_pct):.2f}%)")
+                log(f"評価損益: {profit_loss_str} {currency} ({float(profit_loss_pct):.2f}%)")
         except Exception as e:
-            print(f"評価額・損益: 計算エラー ({str(e)})")
+            log(f"評価額・損益: 計算エラー ({str(e)})")
         
         # その他の情報
         if 'market_value' in position:
-            print(f"市場評価額: {format_currency(position['market_value'], currency)} {currency}")
+            log(f"市場評価額: {format_currency(position['market_value'], currency)} {currency}")
         if 'unrealized_profit_loss' in position:
-            print(f"未実現損益: {format_currency(position['unrealized_profit_loss'], currency)} {currency}")
+            log(f"未実現損益: {format_currency(position['unrealized_profit_loss'], currency)} {currency}")
         if 'realized_profit_loss' in position:
-            print(f"実現損益: {format_currency(position['realized_profit_loss'], currency)} {currency}")
+            log(f"実現損益: {format_currency(position['realized_profit_loss'], currency)} {currency}")
         
-        print("-" * 100)
+        log("-" * 100)
+    
+    # 通貨別合計の表示(計算できたポジションのみを集計)
+    if totals:
+        log("\n通貨別合計:")
+        log("=" * 100)
+        for currency, (total_market_value, total_profit_loss) in totals.items():
+            sign = "+" if total_profit_loss >= 0 else ""
+            log(f"{currency}: 評価額 {format_currency(str(total_market_value), currency)} {currency}"
+                f" / 評価損益 {sign}{format_currency(str(total_profit_loss), currency)} {currency}")
+        log("=" * 100)
 
 
 def main():
@@ -291,49 +340,52 @@ def main():
     script_name = os.path.splitext(os.path.basename(__file__))[0]
     # スクリプトと同じディレクトリにmdファイルを出力
     md_filename = os.path.join(script_dir, f"{script_name}.md")
-    sys.stdout = MarkdownLogger(md_filename)
+    # 出力は MarkdownLogger.write_line で標準出力とファイルの両方に書き込む
+    # (sys.stdout は差し替えない)
+    md_logger = MarkdownLogger(md_filename)
+    log = md_logger.write_line
     
     try:
-        print(f"# Webull ポジション表示レポート")
-        print(f"\n実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("\n" + "=" * 100)
-        print("Webull Japan OpenAPI - ポジション情報取得")
-        print("=" * 100)
+        log(f"# Webull ポジション表示レポート")
+        log(f"\n実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        log("\n" + "=" * 100)
+        log("Webull Japan OpenAPI - ポジション情報取得")
+        log("=" * 100)
         
         # APIクライアントの初期化(日本リージョン)
-        print("\nAPIクライアントを初期化しています...")
-        api_client = ApiClient(app_key, app_secret, Region.JP.value)
-        api = API(api_client)
-        print("✓ APIクライアントの初期化が完了しました")
+        log("\nAPIクライアントを初期化しています...")
+        # 同じプロセス内の他のレポートとクライアント・HTTP接続を共有する
+        api = get_api(app_key, app_secret)
+        log("✓ APIクライアントの初期化が完了しました")
         
         # アカウントIDの取得
-        print("\nアカウント情報を取得しています...")
-        account_id = get_account_id(api)
+        log("\nアカウント情報を取得しています...")
+        account_id = get_account_id(api, app_key, log)
         
         if not account_id:
-            print("エラー: アカウントIDが取得できませんでした。")
+            log("エラー: アカウントIDが取得できませんでした。")
             return
         
-        print(f"✓ アカウントIDを取得しました")
+        log(f"✓ アカウントIDを取得しました")
         
         # ポジション情報の取得
-        print("\nポジション情報を取得しています...")
-        positions = get_positions(api, account_id)
-        print(f"✓ ポジション情報の取得が完了しました({len(positions)}件)")
+        log("\nポジション情報を取得しています...")
+        positions = get_positions(api, account_id, log=log)
+        log(f"✓ ポジション情報の取得が完了しました({len(positions)}件)")
         
         # ポジション情報の表示
-        display_positions(positions)
+        display_positions(positions, log)
         
-        print("\n処理が正常に完了しました。")
-        print(f"\n出力ファイル: {md_filename}")
+        log("\n処理が正常に完了しました。")
+        log(f"\n出力ファイル: {md_filename}")
         
     except Exception as e:
-        print(f"\nエラー: 予期しない例外が発生しました - {str(e)}")
+        log(f"\nエラー: 予期しない例外が発生しました - {str(e)}")
         import traceback
         traceback.print_exc()
     finally:
-        # 標準出力を元に戻す
-        sys.stdout = sys.__stdout__
+        # Markdownファイルを閉じる
+        md_logger.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Webull Japan OpenAPI - 銘柄取得調査スクリプト共通処理
+show_symbol_jp.py / show_symbol_us.py で共有する処理をまとめたモジュール
+
+- APIキーの設定確認（python-dotenv は必要なときだけ読み込む）
+- 両レポートに共通のMarkdown（環境設定の確認結果、公式ドキュメントのURL）
+- レポートの出力（Markdownファイルへの保存と標準出力）
+"""
+
+import os
+import sys
+from datetime import datetime
+from typing import Callable, Final, Optional
+
+# Webull Japan OpenAPI 公式ドキュメント
+API_DOC_URL: Final[str] = "https://developer.webull.co.jp/api-doc/"
+
+# 「1. 環境設定の確認」セクション(APIキーが未設定の場合は設定方法を案内する)
+_ENV_SECTION_OK: Final[str] = "## 1. 環境設定の確認\n\n### ✓ APIキーの設定を確認しました\n\n"
+_ENV_SECTION_MISSING: Final[str] = "\n".join((
+    "## 1. 環境設定の確認",
+    "",
+    "### ⚠️ APIキーが設定されていません",
+    "",
+    "`.env`ファイルに以下の設定が必要です:",
+    "",
+    "```",
+    "WEBULL_APP_KEY=your_app_key_here",
+    "WEBULL_APP_SECRET=your_app_secret_here",
+    "```",
+    "",
+    "",
+))
+
+# ファイルの先頭にだけ付ける見出しと実行日時
+_HEADER: Final[str] = "# {title}\n\n実行日時: {timestamp}\n\n---\n\n"
+
+# レポート末尾の共通部分(保存先ファイル名を埋め込む)
+_FOOTER: Final[str] = """\
+================================================================================
+調査完了
+================================================================================
+
+このレポートは `{md_basename}` に保存されました。
+"""
+
+
+def api_keys_configured() -> bool:
+    """
+    APIキーとシークレットが設定されているかを確認する
+    環境変数に設定済みであれば .env ファイルは読み込まない
+    未設定でスクリプトと同じ階層に .env ファイルがある場合だけ、dotenv を読み込んで確認し直す
+    
+    Returns:
+        両方が設定されていれば True
+    """
+    if os.getenv('WEBULL_APP_KEY') and os.getenv('WEBULL_APP_SECRET'):
+        return True
+    
+    env_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+    if not os.path.exists(env_file):
+        return False
+    
+    # .envファイルの読み込み(認証情報は出力しない)
+    from dotenv import load_dotenv
+    load_dotenv(env_file)
+    return bool(os.getenv('WEBULL_APP_KEY') and os.getenv('WEBULL_APP_SECRET'))
+
+
+def env_section() -> str:
+    """「1. 環境設定の確認」セクションのMarkdownを返す(認証情報は出力しない)"""
+    return _ENV_SECTION_OK if api_keys_configured() else _ENV_SECTION_MISSING
+
+
+def emit_report(script_file: str, title: str, body: str,
+                write: Optional[Callable[[str], object]] = None) -> None:
+    """
+    レポートをMarkdownファイルに保存し、標準出力にも表示する
+    ファイルは実行ファイルと同じ階層に「スクリプト名.md」で作成する
+    
+    Args:
+        script_file: 呼び出し元スクリプトのパス(__file__)
+        title: ファイルの見出し
+        body: レポート本文(末尾に共通のフッターを付ける)
+        write: 本文の表示先(省略時は sys.stdout.write)
+               出力先を変えるときも sys.stdout を差し替える必要はない
+    """
+    # Markdownファイルへの出力設定（実行ファイルと同じ階層に出力）
+    # 拡張子の置き換えは文字列操作で行い、相対パスで実行されたときだけ絶対パスに変換する
+    md_filename = (script_file[:-3] if script_file.endswith('.py') else script_file) + '.md'
+    if not os.path.isabs(md_filename):
+        md_filename = os.path.abspath(md_filename)
+    
+    # レポート全体を組み立ててから、ファイルと標準出力へ1回ずつ書き込む
+    report = body + _FOOTER.format(md_basename=os.path.basename(md_filename))
+    header = _HEADER.format(title=title, timestamp=datetime.now().strftime('%Y年%m月%d日 %H:%M:%S'))
+    
+    # レポート全体を一度にUTF-8へ変換し、バイナリモードで書き込む
+    # (テキストモードの逐次エンコードと改行変換を行わない。書き込みは close 時の1回だけ)
+    with open(md_filename, 'wb', buffering=1 << 20) as f:
+        f.write((header + report).encode('utf-8'))
+    
+    # 改行込みの本文を1回で書き込む(端末でのフラッシュも1回で済む)
+    (write or sys.stdout.write)(report)
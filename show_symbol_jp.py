@@ -5,217 +5,153 @@ Webull Japan OpenAPI を使用して日本株銘柄の取得を試みます。
 ただし、現時点でのAPI仕様上の制限により、完全な銘柄一覧の取得は不可能です。
 """
 
-import os
-from dotenv import load_dotenv
-import sys
-from datetime import datetime
+from typing import Final
+
+from show_symbol_common import API_DOC_URL, emit_report, env_section
+
+# Markdownファイルの見出し
+_TITLE_JP: Final[str] = "日本株銘柄取得スクリプト実行結果"
+
+# レポート本文のテンプレート(共通の環境設定セクションと公式ドキュメントのURLを埋め込む)
+_REPORT_JP: Final[str] = """\
+================================================================================
+Webull Japan OpenAPI - 日本株銘柄取得の実行可否調査
+================================================================================
+
+{env_section}## 2. Webull Japan OpenAPI 仕様調査結果
+
+### 📋 公式ドキュメントの確認内容
+
+Webull Japan OpenAPI の公式ドキュメント({api_doc_url})を
+詳細に調査した結果、以下の事実が判明しました。
+
+### ⚠️ 重要な制限事項
+
+#### 対応市場
+
+公式ドキュメントの「Market Supported」セクションには:
+
+> **U.S. stocks and ETFs.**
+
+と明記されており、**現時点では米国株とETFのみがサポート対象**となっています。
+
+#### 日本株対応について
+
+Webull証券は日本株/ETF取引のOpenAPI機能を提供していますが、
+公式APIドキュメントには**米国株とETFのみ**が対応市場として記載されており、
+**日本株(Japanese stocks)に関する明示的なエンドポイントやパラメータの
+記載が確認できませんでした**。
+
+## 3. API仕様の詳細調査
+
+### 利用可能なエンドポイントカテゴリ
+
+Webull Japan OpenAPIは以下のカテゴリで機能を提供:
+
+1. **Trading Management** (取引管理)
+   - 注文作成・変更・キャンセル
+
+2. **Market Information** (マーケット情報)
+   - 株式/ETFのマーケット情報照会(HTTPインターフェース経由)
+
+3. **Account Information** (口座情報)
+   - 口座残高照会
+   - ポジション情報照会
+
+4. **Real-time Subscriptions** (リアルタイム配信)
+   - 注文ステータス変更の購読(GRPC経由)
+
+### ❌ 存在しないエンドポイント
+
+以下の機能は**Webull Japan OpenAPIには実装されていません**:
+
+- **銘柄一覧取得エンドポイント** (Instrument List/Symbol List)
+- **銘柄検索エンドポイント** (Symbol Search)
+- **市場別銘柄一覧取得** (Market-specific Symbol List)
+- **銘柄発見機能** (Symbol Discovery)
+
+つまり、**APIから動的に銘柄リストを取得する手段が提供されていません**。
+
+## 4. API利用の前提条件
+
+Webull OpenAPIを使用するには:
+
+1. Webullアプリへの登録
+2. ウィブル証券口座の開設
+3. OpenAPI利用申請(https://www.webull.co.jp/center)
+4. アプリケーション作成とAPIキー生成
+
+**注意**: 取引/相場の権限は最終的にユーザーの取引権限に依存します。
+
+## 5. 結論
+
+### ❌ 実装不可能
+
+**Webull Japan OpenAPIを使用して日本株の全銘柄一覧を取得することは、
+現時点のAPI仕様では不可能です。**
+
+### 理由
+
+1. **対応市場が米国株とETFのみと明記**
+   - 公式ドキュメントで「U.S. stocks and ETFs」のみ記載
+
+2. **銘柄一覧取得エンドポイントが存在しない**
+   - どの市場においても、銘柄一覧を取得するAPIが提供されていない
+   - API設計思想として「既知の銘柄に対する操作」のみをサポート
+
+3. **銘柄検索・発見機能の欠如**
+   - 銘柄コードやシンボルを検索する機能がない
+   - 新規銘柄の発見や一覧取得が構造的に不可能
+
+## 6. 代替手段
+
+日本株の銘柄情報を取得する場合は、以下の方法を検討してください:
+
+### 方法1: 外部データソースとの組み合わせ
+
+JPX(日本取引所グループ)の公開データや他のAPIから銘柄リストを取得し、
+その後Webull APIで各銘柄の価格やポジション情報を取得する。
+
+### 方法2: 静的な銘柄リストの管理
+
+取引対象の銘柄をリスト化して管理:
+
+```python
+JAPANESE_STOCKS = [
+    {{'code': '7203', 'name': 'トヨタ自動車'}},
+    {{'code': '9984', 'name': 'ソフトバンクグループ'}},
+    # ... 必要な銘柄を列挙
+]
+```
+
+### 方法3: Webullアプリからの情報収集
+
+Webullアプリで表示される銘柄情報を元に、
+取引対象銘柄のマスターデータを作成する。
+
+## 7. 今後の展望
+
+今後のアップデートで以下の機能が追加される可能性があります:
+
+- 日本株専用のエンドポイント
+- 銘柄一覧取得機能
+- 銘柄検索機能
+- 市場別データ取得機能
+
+**最新情報は公式ドキュメント({api_doc_url})で
+確認してください。**
+
+"""
 
-class MarkdownLogger:
-    """標準出力とMarkdownファイルへの同時出力を行うクラス"""
-    
-    def __init__(self, filename):
-        self.terminal = sys.stdout
-        self.log = open(filename, 'w', encoding='utf-8')
-        self.log.write(f"# 日本株銘柄取得スクリプト実行結果\n\n")
-        self.log.write(f"実行日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}\n\n")
-        self.log.write("---\n\n")
-    
-    def write(self, message):
-        self.terminal.write(message)
-        self.log.write(message)
-    
-    def flush(self):
-        self.terminal.flush()
-        self.log.flush()
-    
-    def close(self):
-        self.log.close()
-        sys.stdout = self.terminal
 
 def main():
     """メイン処理"""
     
-    # Markdownファイルへの出力設定（実行ファイルと同じ階層に出力）
-    script_path = os.path.abspath(__file__)
-    script_dir = os.path.dirname(script_path)
-    script_name = os.path.basename(script_path)
-    md_filename = os.path.join(script_dir, script_name.replace('.py', '.md'))
-    logger = MarkdownLogger(md_filename)
-    sys.stdout = logger
-    
-    print("=" * 80)
-    print("Webull Japan OpenAPI - 日本株銘柄取得の実行可否調査")
-    print("=" * 80)
-    print()
-    
-    # .envファイルの読み込み(認証情報は出力しない)
-    print("## 1. 環境設定の確認")
-    print()
-    
-    load_dotenv()
-    app_key = os.getenv('WEBULL_APP_KEY')
-    app_secret = os.getenv('WEBULL_APP_SECRET')
-    
-    if not app_key or not app_secret:
-        print("### ⚠️ APIキーが設定されていません")
-        print()
-        print("`.env`ファイルに以下の設定が必要です:")
-        print("```")
-        print("WEBULL_APP_KEY=your_app_key_here")
-        print("WEBULL_APP_SECRET=your_app_secret_here")
-        print("```")
-        print()
-    else:
-        print("### ✓ APIキーの設定を確認しました")
-        print()
-    
-    # API仕様の調査結果
-    print("## 2. Webull Japan OpenAPI 仕様調査結果")
-    print()
-    
-    print("### 📋 公式ドキュメントの確認内容")
-    print()
-    print("Webull Japan OpenAPI の公式ドキュメント(https://developer.webull.co.jp/api-doc/)を")
-    print("詳細に調査した結果、以下の事実が判明しました。")
-    print()
-    
-    print("### ⚠️ 重要な制限事項")
-    print()
-    print("#### 対応市場")
-    print()
-    print("公式ドキュメントの「Market Supported」セクションには:")
-    print()
-    print("> **U.S. stocks and ETFs.**")
-    print()
-    print("と明記されており、**現時点では米国株とETFのみがサポート対象**となっています。")
-    print()
-    
-    print("#### 日本株対応について")
-    print()
-    print("Webull証券は日本株/ETF取引のOpenAPI機能を提供していますが、")
-    print("公式APIドキュメントには**米国株とETFのみ**が対応市場として記載されており、")
-    print("**日本株(Japanese stocks)に関する明示的なエンドポイントやパラメータの")
-    print("記載が確認できませんでした**。")
-    print()
-    
-    print("## 3. API仕様の詳細調査")
-    print()
-    
-    print("### 利用可能なエンドポイントカテゴリ")
-    print()
-    print("Webull Japan OpenAPIは以下のカテゴリで機能を提供:")
-    print()
-    print("1. **Trading Management** (取引管理)")
-    print("   - 注文作成・変更・キャンセル")
-    print()
-    print("2. **Market Information** (マーケット情報)")
-    print("   - 株式/ETFのマーケット情報照会(HTTPインターフェース経由)")
-    print()
-    print("3. **Account Information** (口座情報)")
-    print("   - 口座残高照会")
-    print("   - ポジション情報照会")
-    print()
-    print("4. **Real-time Subscriptions** (リアルタイム配信)")
-    print("   - 注文ステータス変更の購読(GRPC経由)")
-    print()
-    
-    print("### ❌ 存在しないエンドポイント")
-    print()
-    print("以下の機能は**Webull Japan OpenAPIには実装されていません**:")
-    print()
-    print("- **銘柄一覧取得エンドポイント** (Instrument List/Symbol List)")
-    print("- **銘柄検索エンドポイント** (Symbol Search)")
-    print("- **市場別銘柄一覧取得** (Market-specific Symbol List)")
-    print("- **銘柄発見機能** (Symbol Discovery)")
-    print()
-    print("つまり、**APIから動的に銘柄リストを取得する手段が提供されていません**。")
-    print()
-    
-    print("## 4. API利用の前提条件")
-    print()
-    print("Webull OpenAPIを使用するには:")
-    print()
-    print("1. Webullアプリへの登録")
-    print("2. ウィブル証券口座の開設")
-    print("3. OpenAPI利用申請(https://www.webull.co.jp/center)")
-    print("4. アプリケーション作成とAPIキー生成")
-    print()
-    print("**注意**: 取引/相場の権限は最終的にユーザーの取引権限に依存します。")
-    print()
-    
-    print("## 5. 結論")
-    print()
-    print("### ❌ 実装不可能")
-    print()
-    print("**Webull Japan OpenAPIを使用して日本株の全銘柄一覧を取得することは、")
-    print("現時点のAPI仕様では不可能です。**")
-    print()
-    
-    print("### 理由")
-    print()
-    print("1. **対応市場が米国株とETFのみと明記**")
-    print("   - 公式ドキュメントで「U.S. stocks and ETFs」のみ記載")
-    print()
-    print("2. **銘柄一覧取得エンドポイントが存在しない**")
-    print("   - どの市場においても、銘柄一覧を取得するAPIが提供されていない")
-    print("   - API設計思想として「既知の銘柄に対する操作」のみをサポート")
-    print()
-    print("3. **銘柄検索・発見機能の欠如**")
-    print("   - 銘柄コードやシンボルを検索する機能がない")
-    print("   - 新規銘柄の発見や一覧取得が構造的に不可能")
-    print()
-    
-    print("## 6. 代替手段")
-    print()
-    print("日本株の銘柄情報を取得する場合は、以下の方法を検討してください:")
-    print()
-    
-    print("### 方法1: 外部データソースとの組み合わせ")
-    print()
-    print("JPX(日本取引所グループ)の公開データや他のAPIから銘柄リストを取得し、")
-    print("その後Webull APIで各銘柄の価格やポジション情報を取得する。")
-    print()
-    
-    print("### 方法2: 静的な銘柄リストの管理")
-    print()
-    print("取引対象の銘柄をリスト化して管理:")
-    print()
-    print("```python")
-    print("JAPANESE_STOCKS = [")
-    print("    {'code': '7203', 'name': 'トヨタ自動車'},")
-    print("    {'code': '9984', 'name': 'ソフトバンクグループ'},")
-    print("    # ... 必要な銘柄を列挙")
-    print("]")
-    print("```")
-    print()
-    
-    print("### 方法3: Webullアプリからの情報収集")
-    print()
-    print("Webullアプリで表示される銘柄情報を元に、")
-    print("取引対象銘柄のマスターデータを作成する。")
-    print()
-    
-    print("## 7. 今後の展望")
-    print()
-    print("今後のアップデートで以下の機能が追加される可能性があります:")
-    print()
-    print("- 日本株専用のエンドポイント")
-    print("- 銘柄一覧取得機能")
-    print("- 銘柄検索機能")
-    print("- 市場別データ取得機能")
-    print()
-    print("**最新情報は公式ドキュメント(https://developer.webull.co.jp/api-doc/)で")
-    print("確認してください。**")
-    print()
-    
-    print("=" * 80)
-    print("調査完了")
-    print("=" * 80)
-    print()
-    print(f"このレポートは `{os.path.basename(md_filename)}` に保存されました。")
+    # 共通の環境設定セクション(APIキーの確認結果)と公式ドキュメントのURLを埋め込む
+    body = _REPORT_JP.format(env_section=env_section(), api_doc_url=API_DOC_URL)
     
-    # ロガーのクリーンアップ
-    logger.close()
+    # 実行ファイルと同じ階層のMarkdownファイルに保存し、標準出力にも表示する
+    emit_report(__file__, _TITLE_JP, body)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
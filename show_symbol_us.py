@@ -4,187 +4,158 @@
 Webull Japan OpenAPI を使用して米国株銘柄一覧の取得を試みます。
 """
 
-import os
-from dotenv import load_dotenv
-import sys
-from datetime import datetime
+from typing import Final
+
+from show_symbol_common import API_DOC_URL, emit_report, env_section
+
+# Markdownファイルの見出し
+_TITLE_US: Final[str] = "米国株銘柄一覧取得スクリプト実行結果"
+
+# レポート本文のテンプレート(共通の環境設定セクションと公式ドキュメントのURLを埋め込む)
+_REPORT_US: Final[str] = """\
+================================================================================
+米国株銘柄一覧取得スクリプト - 実行可否調査
+================================================================================
+
+{env_section}## 2. Webull Japan OpenAPI 仕様確認
+
+公式ドキュメント({api_doc_url})を確認した結果:
+
+### 対応市場
+
+> **U.S. stocks and ETFs.**
+
+Webull Japan OpenAPIは**米国株とETFの取引・データ取得をサポート**しています。
+
+**重要**: これは米国株の取引やマーケットデータ取得が可能という意味であり、
+**銘柄一覧を取得できる**という意味ではありません。
+
+### 利用可能なエンドポイント
+
+Webull Japan OpenAPIが提供する機能（既知の銘柄シンボルに対して）:
+
+
+1. **Trading Management** (取引管理)
+   - 指定した銘柄の注文作成・変更・キャンセル
+   - 注文履歴照会
+
+2. **Market Information** (マーケット情報)
+   - 指定した銘柄のリアルタイム相場データ
+   - 指定した銘柄のローソク足データ
+
+3. **Account Information** (口座情報)
+   - 口座残高照会
+   - 保有ポジション照会
+
+4. **Real-time Subscriptions** (リアルタイム配信)
+   - 注文ステータス変更通知
+
+5. **Trading Calendar** (取引カレンダー)
+   - 取引日確認
+
+**すべての機能で共通**: ティッカーシンボル(例: AAPL、TSLA)を**事前に知っている必要**があります。
+
+## 3. 銘柄一覧取得が不可能な理由
+
+### ❌ 実装不可能
+
+**Webull Japan OpenAPIを使用して米国株の銘柄一覧を取得することは不可能です。**
+
+**補足**: 米国株の「取引」や「データ取得」は可能ですが、
+「どんな銘柄があるか」の一覧を取得する機能はありません。
+
+### 理由
+
+
+#### 1. 銘柄一覧取得エンドポイントが存在しない
+
+公式ドキュメントを詳細に調査した結果、以下のエンドポイントが**提供されていません**:
+
+
+- **銘柄一覧取得** (Symbol List / Instrument List)
+  - 例: 「全NYSE上場銘柄を取得」「全NASDAQ上場銘柄を取得」
+- **銘柄検索** (Symbol Search)
+  - 例: 「Appleで検索してAAPLを見つける」
+- **銘柄情報取得** (Instrument Information)
+  - 例: 「AAPLの正式名称や上場市場を取得」
+- **取引所別銘柄リスト** (Exchange-specific Symbol List)
+  - 例: 「NYSEに上場している全銘柄」
+
+#### 2. API設計思想の制限
+
+Webull Japan OpenAPIは以下の前提で設計されています:
+
+
+- **ユーザーは既に取引したい銘柄のシンボルを知っている**
+- **既知のシンボルに対して**取引やデータ取得を行う
+- 銘柄の「発見」や「探索」は想定されていない
+
+**具体例**:
+- ✅ できる: 「AAPLの現在価格を取得」「TSLAの注文を出す」
+- ❌ できない: 「テクノロジー銘柄の一覧を取得」「Appleを検索」
+
+#### 3. 他の市場データAPIとの違い
+
+多くの市場データAPIは以下の機能を提供していますが、Webull APIは提供していません:
+
+
+| 機能 | 一般的なAPI | Webull API |
+|------|------------|-----------|
+| 銘柄一覧取得 | ✅ 可能 | ❌ 不可能 |
+| 銘柄検索 | ✅ 可能 | ❌ 不可能 |
+| 既知銘柄の取引 | ✅ 可能 | ✅ 可能 |
+| 既知銘柄のデータ取得 | ✅ 可能 | ✅ 可能 |
+
+Webull APIは**取引実行とデータ取得に特化**した設計です。
+
+## 4. 結論
+
+### 📌 重要なポイント
+
+
+**Webull Japan OpenAPIでできること:**
+- ✅ 米国株とETFの**取引**（既知のシンボルに対して）
+- ✅ 米国株とETFの**マーケットデータ取得**（既知のシンボルに対して）
+- ✅ 口座情報・ポジション情報の取得
+
+**Webull Japan OpenAPIでできないこと:**
+- ❌ 米国株の**銘柄一覧取得**
+- ❌ 米国株の**銘柄検索**
+- ❌ 銘柄の**発見・探索**
+
+### まとめ
+
+Webull Japan OpenAPIは**銘柄一覧を動的に取得する機能が実装されていない**ため、
+APIだけで米国株の全銘柄リストを取得することはできません。
+
+
+**実際の使用方法:**
+
+銘柄を取引する際は、以下のいずれかの方法でティッカーシンボルを特定してから
+APIを使用する必要があります:
+
+
+1. **Webullアプリで銘柄を確認**
+   - アプリの画面でティッカーシンボルを確認してから、APIで取引
+
+2. **ティッカーシンボルを事前に把握**
+   - AAPL(Apple)、TSLA(Tesla)など、よく知られた銘柄を使用
+
+3. **外部の銘柄リストを参照**
+   - 証券取引所や他のデータプロバイダーから銘柄リストを取得
+   - その後、Webull APIでマーケットデータ取得や取引を実行
+
+"""
 
-class MarkdownLogger:
-    """標準出力とMarkdownファイルへの同時出力を行うクラス"""
-    
-    def __init__(self, filename):
-        self.terminal = sys.stdout
-        self.log = open(filename, 'w', encoding='utf-8')
-        self.log.write(f"# 米国株銘柄一覧取得スクリプト実行結果\n\n")
-        self.log.write(f"実行日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}\n\n")
-        self.log.write("---\n\n")
-    
-    def write(self, message):
-        self.terminal.write(message)
-        self.log.write(message)
-    
-    def flush(self):
-        self.terminal.flush()
-        self.log.flush()
-    
-    def close(self):
-        self.log.close()
-        sys.stdout = self.terminal
 
 def main():
     """メイン処理"""
     
-    # Markdownファイルへの出力設定（実行ファイルと同じ階層に出力）
-    script_path = os.path.abspath(__file__)
-    script_dir = os.path.dirname(script_path)
-    script_name = os.path.basename(script_path)
-    md_filename = os.path.join(script_dir, script_name.replace('.py', '.md'))
-    logger = MarkdownLogger(md_filename)
-    sys.stdout = logger
-    
-    print("=" * 80)
-    print("米国株銘柄一覧取得スクリプト - 実行可否調査")
-    print("=" * 80)
-    print()
-    
-    # .envファイルの読み込み(認証情報は出力しない)
-    print("## 1. 環境設定の確認\n")
-    
-    load_dotenv()
-    app_key = os.getenv('WEBULL_APP_KEY')
-    app_secret = os.getenv('WEBULL_APP_SECRET')
-    
-    if not app_key or not app_secret:
-        print("### ⚠️ APIキーが設定されていません\n")
-        print("`.env`ファイルに以下の設定が必要です:\n")
-        print("```")
-        print("WEBULL_APP_KEY=your_app_key_here")
-        print("WEBULL_APP_SECRET=your_app_secret_here")
-        print("```")
-        print()
-    else:
-        print("### ✓ APIキーの設定を確認しました\n")
-    
-    # API仕様の確認
-    print("## 2. Webull Japan OpenAPI 仕様確認\n")
-    print("公式ドキュメント(https://developer.webull.co.jp/api-doc/)を確認した結果:\n")
-    
-    print("### 対応市場\n")
-    print("> **U.S. stocks and ETFs.**\n")
-    print("Webull Japan OpenAPIは**米国株とETFの取引・データ取得をサポート**しています。\n")
-    print("**重要**: これは米国株の取引やマーケットデータ取得が可能という意味であり、")
-    print("**銘柄一覧を取得できる**という意味ではありません。\n")
-    
-    print("### 利用可能なエンドポイント\n")
-    print("Webull Japan OpenAPIが提供する機能（既知の銘柄シンボルに対して）:\n")
-    print()
-    print("1. **Trading Management** (取引管理)")
-    print("   - 指定した銘柄の注文作成・変更・キャンセル")
-    print("   - 注文履歴照会")
-    print()
-    print("2. **Market Information** (マーケット情報)")
-    print("   - 指定した銘柄のリアルタイム相場データ")
-    print("   - 指定した銘柄のローソク足データ")
-    print()
-    print("3. **Account Information** (口座情報)")
-    print("   - 口座残高照会")
-    print("   - 保有ポジション照会")
-    print()
-    print("4. **Real-time Subscriptions** (リアルタイム配信)")
-    print("   - 注文ステータス変更通知")
-    print()
-    print("5. **Trading Calendar** (取引カレンダー)")
-    print("   - 取引日確認")
-    print()
-    print("**すべての機能で共通**: ティッカーシンボル(例: AAPL、TSLA)を**事前に知っている必要**があります。\n")
-    
-    # 実行不可能な理由
-    print("## 3. 銘柄一覧取得が不可能な理由\n")
-    print("### ❌ 実装不可能\n")
-    print("**Webull Japan OpenAPIを使用して米国株の銘柄一覧を取得することは不可能です。**\n")
-    print("**補足**: 米国株の「取引」や「データ取得」は可能ですが、")
-    print("「どんな銘柄があるか」の一覧を取得する機能はありません。\n")
-    
-    print("### 理由\n")
-    print()
-    print("#### 1. 銘柄一覧取得エンドポイントが存在しない\n")
-    print("公式ドキュメントを詳細に調査した結果、以下のエンドポイントが**提供されていません**:\n")
-    print()
-    print("- **銘柄一覧取得** (Symbol List / Instrument List)")
-    print("  - 例: 「全NYSE上場銘柄を取得」「全NASDAQ上場銘柄を取得」")
-    print("- **銘柄検索** (Symbol Search)")
-    print("  - 例: 「Appleで検索してAAPLを見つける」")
-    print("- **銘柄情報取得** (Instrument Information)")
-    print("  - 例: 「AAPLの正式名称や上場市場を取得」")
-    print("- **取引所別銘柄リスト** (Exchange-specific Symbol List)")
-    print("  - 例: 「NYSEに上場している全銘柄」")
-    print()
-    
-    print("#### 2. API設計思想の制限\n")
-    print("Webull Japan OpenAPIは以下の前提で設計されています:\n")
-    print()
-    print("- **ユーザーは既に取引したい銘柄のシンボルを知っている**")
-    print("- **既知のシンボルに対して**取引やデータ取得を行う")
-    print("- 銘柄の「発見」や「探索」は想定されていない")
-    print()
-    print("**具体例**:")
-    print("- ✅ できる: 「AAPLの現在価格を取得」「TSLAの注文を出す」")
-    print("- ❌ できない: 「テクノロジー銘柄の一覧を取得」「Appleを検索」")
-    print()
-    
-    print("#### 3. 他の市場データAPIとの違い\n")
-    print("多くの市場データAPIは以下の機能を提供していますが、Webull APIは提供していません:\n")
-    print()
-    print("| 機能 | 一般的なAPI | Webull API |")
-    print("|------|------------|-----------|")
-    print("| 銘柄一覧取得 | ✅ 可能 | ❌ 不可能 |")
-    print("| 銘柄検索 | ✅ 可能 | ❌ 不可能 |")
-    print("| 既知銘柄の取引 | ✅ 可能 | ✅ 可能 |")
-    print("| 既知銘柄のデータ取得 | ✅ 可能 | ✅ 可能 |")
-    print()
-    print("Webull APIは**取引実行とデータ取得に特化**した設計です。\n")
-    
-    print("## 4. 結論\n")
-    print("### 📌 重要なポイント\n")
-    print()
-    print("**Webull Japan OpenAPIでできること:**")
-    print("- ✅ 米国株とETFの**取引**（既知のシンボルに対して）")
-    print("- ✅ 米国株とETFの**マーケットデータ取得**（既知のシンボルに対して）")
-    print("- ✅ 口座情報・ポジション情報の取得")
-    print()
-    print("**Webull Japan OpenAPIでできないこと:**")
-    print("- ❌ 米国株の**銘柄一覧取得**")
-    print("- ❌ 米国株の**銘柄検索**")
-    print("- ❌ 銘柄の**発見・探索**")
-    print()
-    print("### まとめ\n")
-    print("Webull Japan OpenAPIは**銘柄一覧を動的に取得する機能が実装されていない**ため、")
-    print("APIだけで米国株の全銘柄リストを取得することはできません。\n")
-    print()
-    print("**実際の使用方法:**")
-    print()
-    print("銘柄を取引する際は、以下のいずれかの方法でティッカーシンボルを特定してから")
-    print("APIを使用する必要があります:\n")
-    print()
-    print("1. **Webullアプリで銘柄を確認**")
-    print("   - アプリの画面でティッカーシンボルを確認してから、APIで取引")
-    print()
-    print("2. **ティッカーシンボルを事前に把握**")
-    print("   - AAPL(Apple)、TSLA(Tesla)など、よく知られた銘柄を使用")
-    print()
-    print("3. **外部の銘柄リストを参照**")
-    print("   - 証券取引所や他のデータプロバイダーから銘柄リストを取得")
-    print("   - その後、Webull APIでマーケットデータ取得や取引を実行")
-    print()
-    
-    print("=" * 80)
-    print("調査完了")
-    print("=" * 80)
-    print()
-    print(f"このレポートは `{os.path.basename(md_filename)}` に保存されました。")
+    # 共通の環境設定セクション(APIキーの確認結果)と公式ドキュメントのURLを埋め込む
+    body = _REPORT_US.format(env_section=env_section(), api_doc_url=API_DOC_URL)
     
-    # ロガーのクリーンアップ
-    logger.close()
+    # 実行ファイルと同じ階層のMarkdownファイルに保存し、標準出力にも表示する
+    emit_report(__file__, _TITLE_US, body)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Webull Japan OpenAPI - APIクライアント共通処理
+show_his.py / show_pos.py で共有するAPIクライアントと口座一覧を管理するモジュール
+
+- APIクライアントは認証情報ごとに1プロセスで1つだけ作成し、HTTP接続(keep-alive)を共有する
+- 口座一覧はディスクキャッシュ(show_asset と共通)から取得し、プロセス内でも保持する
+- 単体で実行すると、当日取引履歴とポジションのレポートを1つのプロセスで続けて作成する
+"""
+
+import sys
+from functools import lru_cache
+
+from webullsdkcore.client import ApiClient
+from webullsdktrade.api import API
+from webullsdkcore.common.region import Region
+
+from show_asset_common import cached_subscriptions, enable_connection_pooling
+
+# 取得済みの口座一覧(App Keyごと)
+_subscriptions = {}
+
+
+@lru_cache(maxsize=None)
+def get_api(app_key: str, app_secret: str) -> API:
+    """
+    APIクライアントを取得する
+    同じ認証情報に対しては、最初に作成したインスタンスを返す
+    
+    Args:
+        app_key: Webull APIアプリケーションキー
+        app_secret: Webull APIアプリケーションシークレット
+    
+    Returns:
+        API インスタンス
+    """
+    # APIクライアントの初期化(日本リージョン)
+    api = API(ApiClient(app_key, app_secret, Region.JP.value))
+    
+    # 以降のすべてのリクエストでHTTP接続(keep-alive)を再利用する
+    enable_connection_pooling()
+    return api
+
+
+def get_subscriptions(api: API, app_key: str):
+    """
+    口座一覧を取得する
+    取得に成功した結果はプロセス内で保持し、2回目以降はAPIもディスクキャッシュも参照しない
+    
+    Args:
+        api: API インスタンス
+        app_key: キャッシュのキーに使用するAPIキー
+    
+    Returns:
+        (口座リスト, レスポンス) のタプル(cached_subscriptions と同じ)
+        保持済み・キャッシュ使用時はレスポンスが None、取得失敗時は口座リストが None
+    """
+    subscriptions = _subscriptions.get(app_key)
+    if subscriptions is not None:
+        return subscriptions, None
+    
+    subscriptions, response = cached_subscriptions(api, app_key)
+    if subscriptions is not None:
+        _subscriptions[app_key] = subscriptions
+    return subscriptions, response
+
+
+def main_both():
+    """
+    当日取引履歴とポジションのレポートを続けて作成する
+    APIクライアントと口座一覧は2つのレポートで共有する
+    
+    Returns:
+        終了コード(いずれかのレポートが失敗した場合は0以外)
+    """
+    import show_his
+    import show_pos
+    
+    status = 0
+    for report in (show_his.main, show_pos.main):
+        try:
+            report()
+        except SystemExit as e:
+            # 一方のレポートが失敗しても、もう一方は作成する
+            status = status or e.code
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main_both())